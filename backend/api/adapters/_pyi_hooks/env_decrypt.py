@@ -0,0 +1,179 @@
+# ForgeX runtime hook: decrypt the bundled forgex.env.enc into os.environ (no logging)
+# --- forgex params ---
+_MODE = 'env'
+_ENV_VAR = 'FGX_ENV_KEY'
+_FILE_PATH = ''
+_SEALED_PP_B64 = ''
+_PEPPER_B64 = ''
+_EXPECTED_ENV_SHA256 = ''
+_INLINE_PP_FB = ''
+# --- end forgex params ---
+import sys, os, re, base64, hashlib, ctypes
+from functools import lru_cache
+from pathlib import Path
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+_HDR = b'FGXPP2'
+# KEY=VALUE lines of the decrypted .env; blank, comment and '='-less lines never match
+_ENV_LINE_RE = re.compile(rb'(?m)^[ \t]*([^#=\s][^=\r\n]*)=([^\r\n]*)')
+def _is_windows():
+    return sys.platform.startswith('win')
+@lru_cache(maxsize=None)
+def _exe_hash():
+    # Hashed once per launch (every cache lookup needs the key name), streamed rather than read whole
+    try:
+        with open(getattr(sys, 'executable', sys.argv[0]), 'rb') as f:
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+    except Exception:
+        return ''
+def _cache_key_name():
+    h = _exe_hash()[:16] or 'default'
+    return f'FGX_ENV_{h}'
+class _DATA_BLOB(ctypes.Structure):
+    _fields_ = [('cbData', ctypes.c_uint), ('pbData', ctypes.POINTER(ctypes.c_byte))]
+# DPAPI entry points resolved and typed once at import instead of looked up on every call
+_CryptProtectData = _CryptUnprotectData = _LocalFree = None
+if _is_windows():
+    try:
+        _crypt32 = ctypes.WinDLL('crypt32')
+        _CryptProtectData, _CryptUnprotectData = _crypt32.CryptProtectData, _crypt32.CryptUnprotectData
+        for _fn in (_CryptProtectData, _CryptUnprotectData):
+            _fn.argtypes = [ctypes.POINTER(_DATA_BLOB), ctypes.c_void_p, ctypes.POINTER(_DATA_BLOB),
+                            ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.POINTER(_DATA_BLOB)]
+            _fn.restype = ctypes.c_int
+        _LocalFree = ctypes.WinDLL('kernel32').LocalFree
+        _LocalFree.argtypes = [ctypes.c_void_p]
+        _LocalFree.restype = ctypes.c_void_p
+    except Exception:
+        _CryptProtectData = _CryptUnprotectData = _LocalFree = None
+def _dpapi_call(fn, data: bytes) -> bytes:
+    if fn is None or _LocalFree is None:
+        return b''
+    in_blob = _DATA_BLOB(len(data), ctypes.cast(ctypes.create_string_buffer(data), ctypes.POINTER(ctypes.c_byte)))
+    out_blob = _DATA_BLOB()
+    if not fn(ctypes.byref(in_blob), None, None, None, None, 0x01, ctypes.byref(out_blob)):
+        return b''
+    try:
+        res = ctypes.string_at(out_blob.pbData, out_blob.cbData)
+        return res
+    finally:
+        _LocalFree(out_blob.pbData)
+def _dpapi_protect(data: bytes) -> bytes:
+    return _dpapi_call(_CryptProtectData, data)
+def _dpapi_unprotect(data: bytes) -> bytes:
+    return _dpapi_call(_CryptUnprotectData, data)
+def _cache_put(key: bytes):
+    if not (_is_windows() and key):
+        return
+    try:
+        import winreg
+        data = _dpapi_protect(key)
+        if not data:
+            return
+        with winreg.CreateKey(winreg.HKEY_CURRENT_USER, r'Software\ForgeX\Cache') as k:
+            winreg.SetValueEx(k, _cache_key_name(), 0, winreg.REG_BINARY, data)
+    except Exception:
+        pass
+def _cache_get() -> bytes:
+    if not _is_windows():
+        return b''
+    try:
+        import winreg
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r'Software\ForgeX\Cache') as k:
+            data, _ = winreg.QueryValueEx(k, _cache_key_name())
+            if isinstance(data, bytes) and data:
+                return _dpapi_unprotect(data)
+    except Exception:
+        return b''
+    return b''
+def _sealed_inline_pp() -> bytes:
+    try:
+        if not _SEALED_PP_B64 or not _PEPPER_B64:
+            return (_INLINE_PP_FB or '').encode('utf-8')
+        raw = base64.b64decode(_SEALED_PP_B64)
+        if not raw.startswith(_HDR):
+            return b''
+        salt = raw[len(_HDR):len(_HDR)+16]; nonce = raw[len(_HDR)+16:len(_HDR)+28]; ct = raw[len(_HDR)+28:]
+        pepper = base64.b64decode(_PEPPER_B64)
+        # The pepper is 16 random bytes, so HKDF suffices; stretching it with PBKDF2 bought nothing
+        key = HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=_HDR).derive(pepper)
+        aes = AESGCM(key)
+        return aes.decrypt(nonce, ct, _HDR)
+    except Exception:
+        return b''
+def _get_passphrase() -> bytes:
+    # Resolve from configured mode
+    if _MODE == 'env':
+        v = os.environ.get(_ENV_VAR, '')
+        pp = v.encode('utf-8')
+    elif _MODE == 'file':
+        try:
+            p = Path(_FILE_PATH)
+            pp = p.read_text(encoding='utf-8').strip().encode('utf-8')
+        except Exception:
+            pp = b''
+    elif _MODE == 'inline':
+        pp = _sealed_inline_pp()
+    else:
+        pp = b''
+    return pp
+def _derive_key(passphrase: bytes, data: bytes) -> bytes:
+    if not data.startswith(b'FGXENV1'):
+        raise RuntimeError('invalid header')
+    salt = data[7:23]
+    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=200000)
+    return kdf.derive(passphrase)
+def _dec(key: bytes, data: bytes) -> bytes:
+    nonce = data[23:35]; ct = data[35:]
+    aes = AESGCM(key)
+    return aes.decrypt(nonce, ct, b'')
+try:
+    base = Path(getattr(sys, '_MEIPASS', '')) if getattr(sys, 'frozen', False) else Path(__file__).parent
+    enc_p = base / 'forgex.env.enc'
+    # Read once; the digest check and every decrypt attempt below work on these bytes
+    if _EXPECTED_ENV_SHA256:
+        try:
+            enc_data = enc_p.read_bytes()
+            ok = (hashlib.sha256(enc_data).hexdigest() == _EXPECTED_ENV_SHA256)
+            if not ok:
+                raise SystemExit(1)
+        except Exception:
+            raise SystemExit(1)
+    else:
+        enc_data = enc_p.read_bytes()
+    raw = None
+    # The DPAPI cache holds the derived key, so a warm launch skips PBKDF2 entirely
+    key = _cache_get()
+    if key:
+        try:
+            raw = _dec(key, enc_data)
+        except Exception:
+            raw = None  # stale or foreign cache entry; derive afresh below
+    if raw is None:
+        pp = _get_passphrase()
+        if not pp:
+            raise SystemExit(1)
+        key = _derive_key(pp, enc_data)
+        raw = _dec(key, enc_data)
+        _cache_put(key)
+    # Load into environment without logging (one regex pass over the decrypted bytes)
+    cnt=0
+    for m in _ENV_LINE_RE.finditer(raw):
+        k = m.group(1).decode('utf-8', errors='ignore').strip()
+        if k and k not in os.environ:
+            os.environ[k] = m.group(2).decode('utf-8', errors='ignore').strip()
+            cnt += 1
+    # Best-effort zeroization
+    try:
+        import ctypes
+        ba = bytearray(raw)
+        ctypes.memset(ctypes.addressof(ctypes.c_char.from_buffer(ba)), 0, len(ba))
+    except Exception:
+        pass
+except SystemExit:
+    raise
+except Exception:
+    # Do not crash the app; proceed without .env
+    pass
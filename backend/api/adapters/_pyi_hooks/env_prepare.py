@@ -0,0 +1,34 @@
+# ForgeX build helper (run with the build venv, never bundled): encrypt .env and optionally seal its passphrase
+# usage: env_prepare.py <.env> <out.enc> [--seal]   (passphrase in FGX_BUILD_ENV_PASSPHRASE)
+# prints the SHA-256 of <out.enc>, then the sealed passphrase and its pepper in base64 (empty without --seal)
+import os, sys, base64, hashlib
+from pathlib import Path
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+def enc(passphrase: bytes, data: bytes) -> bytes:
+    salt = os.urandom(16)
+    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=200000)
+    key = kdf.derive(passphrase)
+    aes = AESGCM(key)
+    nonce = os.urandom(12)
+    ct = aes.encrypt(nonce, data, b'')
+    return b'FGXENV1' + salt + nonce + ct
+def seal(passphrase: bytes):
+    pep = os.urandom(16)
+    salt = os.urandom(16)
+    nonce = os.urandom(12)
+    # pep is 16 random bytes, so HKDF is enough (no password stretching needed at every app launch)
+    key = HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=b'FGXPP2').derive(pep)
+    ct = AESGCM(key).encrypt(nonce, passphrase, b'FGXPP2')
+    return b'FGXPP2' + salt + nonce + ct, pep
+pp = os.environ.get('FGX_BUILD_ENV_PASSPHRASE','').encode('utf-8')
+if not pp:
+    print('no_passphrase', file=sys.stderr); sys.exit(2)
+out = enc(pp, Path(sys.argv[1]).read_bytes())
+Path(sys.argv[2]).write_bytes(out)
+sealed, pep = seal(pp) if '--seal' in sys.argv[3:] else (b'', b'')
+print(hashlib.sha256(out).hexdigest())
+print(base64.b64encode(sealed).decode('ascii'))
+print(base64.b64encode(pep).decode('ascii'))
@@ -0,0 +1,7 @@
+# ForgeX runtime hook: pause on exit so users can read console output
+# --- forgex params ---
+_SECS = 5
+# --- end forgex params ---
+import atexit
+import time
+atexit.register(time.sleep, _SECS)
@@ -0,0 +1,18 @@
+# ForgeX runtime hook: mask Python logging messages for privacy
+import logging, hashlib
+_old_factory = logging.getLogRecordFactory()
+# Runs for every record: a 6-byte BLAKE2b keeps the same 12-hex-char [masked:…] format with less setup per call
+# (different digest values than the previous SHA-256 prefix, so tokens from older builds won't correlate)
+_blake2b = hashlib.blake2b
+def _fgx_mask_factory(*args, **kwargs):
+    rec = _old_factory(*args, **kwargs)
+    try:
+        msg = rec.getMessage()
+        h = _blake2b(msg.encode('utf-8', errors='ignore'), digest_size=6).hexdigest()
+        rec.msg = f'[masked:{h}]'
+        rec.args = ()
+    except Exception:
+        rec.msg = '[masked]'
+        rec.args = ()
+    return rec
+logging.setLogRecordFactory(_fgx_mask_factory)
@@ -0,0 +1,28 @@
+# ForgeX entry wrapper: run uvicorn safely in windowless builds
+# --- forgex params ---
+_UV_ARGS = []
+# --- end forgex params ---
+import sys, os, logging, logging.config
+from pathlib import Path
+# Ensure stdio streams exist under --noconsole (need real fds)
+if getattr(sys, 'stdin', None) is None: sys.stdin = open(os.devnull, 'r')
+if getattr(sys, 'stdout', None) is None: sys.stdout = open(os.devnull, 'a', buffering=1)
+if getattr(sys, 'stderr', None) is None: sys.stderr = open(os.devnull, 'a', buffering=1)
+from uvicorn import main as _uv_main
+_exe = getattr(sys, 'executable', None) or 'app'
+_log_file = Path(_exe).with_suffix('.log')
+_cfg = {
+  'version': 1,
+  'formatters': { 'basic': { '()': 'logging.Formatter', 'format': '%(asctime)s %(levelname)s [%(name)s] %(message)s' } },
+  'handlers': { 'file': { 'class': 'logging.FileHandler', 'filename': str(_log_file), 'encoding': 'utf-8', 'formatter': 'basic' } },
+  'root': { 'handlers': ['file'], 'level': 'INFO' },
+  'loggers': { 'uvicorn': { 'handlers': ['file'], 'level': 'INFO', 'propagate': False }, 'uvicorn.error': { 'handlers': ['file'], 'level': 'INFO', 'propagate': False }, 'uvicorn.access': { 'handlers': ['file'], 'level': 'INFO', 'propagate': False } }
+}
+try:
+  logging.config.dictConfig(_cfg)
+except Exception:
+  pass
+sys.argv = ['uvicorn', *_UV_ARGS]
+# Force-disable auto-reload in packaged executable to avoid stdio issues
+sys.argv = [a for a in sys.argv if not (a == '--reload' or a.startswith('--reload-dir'))]
+_uv_main()
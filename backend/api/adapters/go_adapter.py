@@ -1,8 +1,83 @@
 from __future__ import annotations
 import asyncio
+import codecs
+import hashlib
 import os
+import re
+import shutil
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Set
+
+# Absolute tool paths resolved once per process; misses are not cached so a later install is picked up
+_TOOLS: Dict[str, str] = {}
+
+
+def _resolve(tool: str) -> str:
+    path = _TOOLS.get(tool)
+    if path is None:
+        path = shutil.which(tool)
+        if path is None:
+            return tool
+        _TOOLS[tool] = path
+    return path
+
+
+# Minimal environment for toolchain subprocesses instead of a full os.environ copy. Keeps OS essentials
+# (incl. Windows install dirs), proxies, TLS/SSH/git settings that `go mod download` needs for private modules
+# and corporate CAs, XDG dirs, the C toolchain cgo uses, and Go settings such as GOOS/GOARCH/GOPROXY/CGO_ENABLED.
+# Names compare upper-cased (Windows env names are case-insensitive, proxies are often lower-case).
+_ENV_KEYS = frozenset({
+    "PATH", "HOME", "LANG", "LC_ALL", "USER", "TMPDIR",
+    "SYSTEMROOT", "SYSTEMDRIVE", "WINDIR", "USERPROFILE", "APPDATA", "LOCALAPPDATA", "PROGRAMDATA",
+    "PROGRAMFILES", "PROGRAMFILES(X86)", "PROGRAMW6432", "TEMP", "TMP", "COMSPEC", "PATHEXT",
+    "HTTP_PROXY", "HTTPS_PROXY", "NO_PROXY", "ALL_PROXY", "SSH_AUTH_SOCK",
+    # Native toolchain discovery (cgo / node-gyp): compilers, flags, pkg-config, Python and MSVC paths
+    "CC", "CXX", "AR", "LD", "CFLAGS", "CXXFLAGS", "CPPFLAGS", "LDFLAGS", "CPATH", "LIBRARY_PATH",
+    "LD_LIBRARY_PATH", "PKG_CONFIG", "PKG_CONFIG_PATH", "PYTHON", "INCLUDE", "LIB", "LIBPATH",
+    "VCINSTALLDIR", "VSINSTALLDIR", "WINDOWSSDKDIR",
+})
+_ENV_PREFIXES = ("GO", "CGO_", "GIT_", "SSL_", "XDG_")
+
+
+def _base_env() -> Dict[str, str]:
+    """Allowlisted copy of os.environ, read per build so later changes (e.g. a reloaded .env) are picked up."""
+    return {k: v for k, v in os.environ.items() if k.upper() in _ENV_KEYS or k.upper().startswith(_ENV_PREFIXES)}
+
+
+def _scan_names(p: Path) -> Set[str]:
+    try:
+        with os.scandir(p) as it:
+            return {e.name for e in it}
+    except OSError:
+        return set()
+
+
+async def _listdir_set(p: Path) -> Set[str]:
+    """Names of the entries directly under p, listed off the event loop in a single scandir."""
+    return await asyncio.to_thread(_scan_names, p)
+
+
+# Reader buffer limit for noisy build tools: very long lines (module listings, traces) fit without overrunning it
+_STREAM_LIMIT = 1 << 20
+
+# Go output lines that are errors once stderr is merged into stdout: compiler/vet diagnostics
+# (file.go:12:5: ...), runtime panics, the "# pkg" header go build prints above them, go command
+# failures ("go: errors parsing go.mod", "go: cannot find main module", "can't load package: ...")
+# and "<path>: ... error/cannot ..." tool messages. Whole-word matches keep github.com/pkg/errors
+# and golang.org/x/xerrors out; "go: downloading ..." style progress lines are checked first and stay info.
+_PROGRESS_LINE_RE = re.compile(r"^go: (?:downloading|finding|extracting|added|upgraded|downgraded|removed|creating) ")
+_ERROR_LINE_RE = re.compile(r"^(?:\S+\.go:\d+:\d+: |panic: |# \S|go: |can't load package)|^\S+: .*\b(?:[Ee]rror|[Cc]annot)\b")
+
+
+def _line_level(line: str) -> str:
+    """Classify a merged stdout/stderr line; tools report failures via the exit code anyway."""
+    if _PROGRESS_LINE_RE.match(line):
+        return "info"
+    if _ERROR_LINE_RE.match(line):
+        return "error"
+    if "warn" in line.lower():
+        return "warn"
+    return "info"
 
 
 async def _run_and_stream(cmd: list[str], env: dict, cwd: Path, log_cb, timeout: int, cancel_event: asyncio.Event) -> int:
@@ -12,55 +87,135 @@ async def _run_and_stream(cmd: list[str], env: dict, cwd: Path, log_cb, timeout:
             cwd=str(cwd),
             env=env,
             stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+            # Interleave stderr into stdout so a single reader task serves the process
+            stderr=asyncio.subprocess.STDOUT,
+            limit=_STREAM_LIMIT,
         )
     except FileNotFoundError:
         await log_cb("error", f"Command not found: {cmd[0]}")
         return 127
 
-    async def reader(stream, level):
+    async def reader(stream):
+        # Read in large chunks and split locally; far fewer awaits than readline() per line.
+        # Decode once per chunk (incrementally, so multi-byte sequences split across reads survive)
+        # rather than once per line; rstrip() only allocates when there is trailing whitespace.
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        buf = ""
         while True:
-            line = await stream.readline()
-            if not line:
+            chunk = await stream.read(65536)
+            if not chunk:
                 break
-            await log_cb(level, line.decode(errors='ignore').rstrip())
+            *lines, buf = (buf + decoder.decode(chunk)).split("\n")
+            for ln in lines:
+                ln = ln.rstrip()
+                await log_cb(_line_level(ln), ln)
+        buf += decoder.decode(b"", final=True)
+        if buf:
+            buf = buf.rstrip()
+            await log_cb(_line_level(buf), buf)
 
-    readers = [asyncio.create_task(reader(proc.stdout, "info")), asyncio.create_task(reader(proc.stderr, "error"))]
+    readers = [asyncio.create_task(reader(proc.stdout))]
+    # Race process exit against cancellation instead of polling every second
+    wait_task = asyncio.create_task(proc.wait())
+    cancel_task = asyncio.create_task(cancel_event.wait())
+    drained = False
     try:
-        while True:
-            if cancel_event.is_set():
-                proc.terminate(); await log_cb("warn", "Build cancelled; terminating process")
-                return -1
+        await asyncio.wait({wait_task, cancel_task}, return_when=asyncio.FIRST_COMPLETED)
+        if not wait_task.done():
+            proc.terminate()
+            await log_cb("warn", "Build cancelled; terminating process")
             try:
-                return await asyncio.wait_for(proc.wait(), timeout=1)
+                await asyncio.wait_for(asyncio.shield(wait_task), timeout=10)
             except asyncio.TimeoutError:
-                pass
+                proc.kill()
+            return -1
+        # Readers stop on EOF once the process exits; drain them so trailing lines are not lost
+        await asyncio.gather(*readers)
+        drained = True
+        return wait_task.result()
     finally:
-        for t in readers:
-            t.cancel()
+        cancel_task.cancel()
+        if proc.returncode is None:
+            # Killed after the grace period, or this task was cancelled (e.g. runner timeout)
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+        if not drained:
+            for t in readers:
+                t.cancel()
+            await asyncio.gather(*readers, return_exceptions=True)
+        # Reap the child so no zombie outlives the build
+        await asyncio.gather(wait_task, return_exceptions=True)
+
+
+def _mod_marker(workdir: Path, names: Set[str], modcache: Path) -> Optional[Path]:
+    """Marker under GOMODCACHE named by the go.mod + go.sum digest (None if they can't be read)."""
+    try:
+        h = hashlib.sha256()
+        for name in ("go.mod", "go.sum"):
+            if name in names:
+                h.update((workdir / name).read_bytes())
+    except OSError:
+        return None
+    return modcache / ".forgex" / h.hexdigest()
+
+
+def _touch_marker(marker: Path) -> None:
+    try:
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.touch()
+    except OSError:
+        pass
 
 
 async def build_go(workdir: Path, project_name: str, build_id: str, request, log_cb, timeout_seconds: int, cancel_event) -> List[str]:
-    env = os.environ.copy()
+    env = _base_env()
+    # Persist module downloads and compiled packages across builds (each workdir is a fresh sandbox)
+    cache_base = Path.home() / ".forgex" / "cache"
+    env.setdefault("GOMODCACHE", os.getenv("FORGEX_GOMODCACHE") or str(cache_base / "gomodcache"))
+    env.setdefault("GOCACHE", os.getenv("FORGEX_GOCACHE") or str(cache_base / "gobuild"))
+    for key in ("GOMODCACHE", "GOCACHE"):
+        try:
+            Path(env[key]).mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            await log_cb("warn", f"Could not create {key} at {env[key]}: {e}")
     dist_dir = workdir / "dist"
     dist_dir.mkdir(parents=True, exist_ok=True)
 
-    # Ensure go present
-    code = await _run_and_stream(["go", "version"], env, workdir, log_cb, timeout_seconds, cancel_event)
-    if code != 0:
+    # Ensure go present (cached PATH lookup instead of spawning `go version` on every build)
+    go = _resolve("go")
+    if "go" not in _TOOLS:
         await log_cb("error", "Go toolchain not found in PATH")
         return []
 
-    # Download deps if mod file present
-    if (workdir / "go.mod").exists():
-        _ = await _run_and_stream(["go", "mod", "download"], env, workdir, log_cb, timeout_seconds, cancel_event)
+    # Download deps if mod file present, unless this exact go.sum was already fetched into GOMODCACHE.
+    # go build still downloads anything missing on demand, so the marker only skips redundant work.
+    names = await _listdir_set(workdir)
+    if "go.mod" in names:
+        marker = await asyncio.to_thread(_mod_marker, workdir, names, Path(env["GOMODCACHE"]))
+        if marker is not None and await asyncio.to_thread(marker.exists):
+            await log_cb("debug", "Go modules already in GOMODCACHE; skipping go mod download")
+        else:
+            code = await _run_and_stream([go, "mod", "download"], env, workdir, log_cb, timeout_seconds, cancel_event)
+            if code == 0 and marker is not None:
+                await asyncio.to_thread(_touch_marker, marker)
 
     # Build current module/package into single binary
     safe_name = (getattr(request, 'output_name', None) or Path(project_name).stem).replace(' ', '_')
     out_path = dist_dir / safe_name
 
     # Honor linux target; for cross-compile, allow GOOS/GOARCH env externally
-    code = await _run_and_stream(["go", "build", "-o", str(out_path)], env, workdir, log_cb, timeout_seconds, cancel_event)
+    # -trimpath keeps GOCACHE entries reusable across sandbox workdirs; -buildvcs=false skips VCS stamping
+    build_cmd = [
+        go, "build",
+        "-p", str(os.cpu_count() or 4),
+        "-trimpath",
+        "-buildvcs=false",
+        "-ldflags=-s -w",
+        "-o", str(out_path),
+    ]
+    code = await _run_and_stream(build_cmd, env, workdir, log_cb, timeout_seconds, cancel_event)
     if code != 0:
         return []
 
@@ -1,13 +1,71 @@
 from __future__ import annotations
 import asyncio
+import codecs
+import hashlib
 import json
 import os
+import re
 import shlex
+import shutil
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 from backend.api.utils.security import validate_command
 
+# Minimal environment for toolchain subprocesses instead of a full os.environ copy. Keeps OS essentials
+# (incl. Windows install dirs), proxies, TLS/SSH/git settings for git dependencies and corporate CAs, XDG dirs,
+# the compiler/Python/MSVC paths node-gyp uses for native addons, and npm/Node/pkg settings
+# (npm_config_*, NODE_*, PKG_*). Names compare upper-cased (Windows env names are case-insensitive).
+_ENV_KEYS = frozenset({
+    "PATH", "HOME", "LANG", "LC_ALL", "USER", "TMPDIR",
+    "SYSTEMROOT", "SYSTEMDRIVE", "WINDIR", "USERPROFILE", "APPDATA", "LOCALAPPDATA", "PROGRAMDATA",
+    "PROGRAMFILES", "PROGRAMFILES(X86)", "PROGRAMW6432", "TEMP", "TMP", "COMSPEC", "PATHEXT",
+    "HTTP_PROXY", "HTTPS_PROXY", "NO_PROXY", "ALL_PROXY", "SSH_AUTH_SOCK",
+    # Native toolchain discovery (cgo / node-gyp): compilers, flags, pkg-config, Python and MSVC paths
+    "CC", "CXX", "AR", "LD", "CFLAGS", "CXXFLAGS", "CPPFLAGS", "LDFLAGS", "CPATH", "LIBRARY_PATH",
+    "LD_LIBRARY_PATH", "PKG_CONFIG", "PKG_CONFIG_PATH", "PYTHON", "INCLUDE", "LIB", "LIBPATH",
+    "VCINSTALLDIR", "VSINSTALLDIR", "WINDOWSSDKDIR",
+})
+_ENV_PREFIXES = ("NPM_CONFIG_", "NODE_", "PKG_", "GIT_", "SSL_", "XDG_")
+
+
+def _base_env() -> Dict[str, str]:
+    """Allowlisted copy of os.environ, read per build so later changes (e.g. a reloaded .env) are picked up."""
+    return {k: v for k, v in os.environ.items() if k.upper() in _ENV_KEYS or k.upper().startswith(_ENV_PREFIXES)}
+
+
+# Absolute tool paths resolved once per process; misses are not cached so a later install is picked up
+_TOOLS: Dict[str, str] = {}
+
+
+def _resolve(tool: str) -> str:
+    path = _TOOLS.get(tool)
+    if path is None:
+        path = shutil.which(tool)
+        if path is None:
+            return tool
+        _TOOLS[tool] = path
+    return path
+
+
+# Reader buffer limit for noisy build tools: very long lines (module listings, traces) fit without overrunning it
+_STREAM_LIMIT = 1 << 20
+
+# npm/pkg output lines that are errors once stderr is merged into stdout: npm/node-gyp error prefixes,
+# thrown errors, and "<tool>: ... error/cannot ..." messages. Anchored/whole-word only, so dependency
+# names (error-ex) and app banner text elsewhere in a line stay info.
+_ERROR_LINE_RE = re.compile(r"^(?:npm ERR!|npm error|Error: |gyp ERR!)|^\S+: .*\b(?:[Ee]rror|[Cc]annot)\b")
+
+
+def _line_level(line: str) -> str:
+    """Classify a merged stdout/stderr line; tools report failures via the exit code anyway."""
+    if _ERROR_LINE_RE.match(line):
+        return "error"
+    if "warn" in line.lower():
+        return "warn"
+    return "info"
+
 
 async def _run_and_stream(cmd: List[str], env: dict, cwd: Path, log_cb, timeout: int, cancel_event: asyncio.Event) -> int:
     # Only allow known tools
@@ -20,85 +78,245 @@ async def _run_and_stream(cmd: List[str], env: dict, cwd: Path, log_cb, timeout:
             cwd=str(cwd),
             env=env,
             stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+            # Interleave stderr into stdout so a single reader task serves the process
+            stderr=asyncio.subprocess.STDOUT,
+            limit=_STREAM_LIMIT,
         )
     except FileNotFoundError:
         await log_cb("error", f"Command not found: {cmd[0]}")
         return 127
 
-    async def reader(stream, level):
+    async def reader(stream):
+        # Read in large chunks and split locally; far fewer awaits than readline() per line.
+        # Decode once per chunk (incrementally, so multi-byte sequences split across reads survive)
+        # rather than once per line; rstrip() only allocates when there is trailing whitespace.
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        buf = ""
         while True:
-            line = await stream.readline()
-            if not line:
+            chunk = await stream.read(65536)
+            if not chunk:
                 break
-            text = line.decode(errors='ignore').rstrip()
-            await log_cb(level, text)
+            *lines, buf = (buf + decoder.decode(chunk)).split("\n")
+            for ln in lines:
+                ln = ln.rstrip()
+                await log_cb(_line_level(ln), ln)
+        buf += decoder.decode(b"", final=True)
+        if buf:
+            buf = buf.rstrip()
+            await log_cb(_line_level(buf), buf)
 
-    readers = [asyncio.create_task(reader(proc.stdout, "info")), asyncio.create_task(reader(proc.stderr, "error"))]
+    readers = [asyncio.create_task(reader(proc.stdout))]
+    # Race process exit against cancellation instead of polling every second
+    wait_task = asyncio.create_task(proc.wait())
+    cancel_task = asyncio.create_task(cancel_event.wait())
+    drained = False
     try:
-        while True:
-            if cancel_event.is_set():
-                proc.terminate()
-                await log_cb("warn", "Build cancelled; terminating process")
-                try:
-                    await asyncio.wait_for(proc.wait(), timeout=10)
-                except asyncio.TimeoutError:
-                    proc.kill()
-                return -1
+        await asyncio.wait({wait_task, cancel_task}, return_when=asyncio.FIRST_COMPLETED)
+        if not wait_task.done():
+            proc.terminate()
+            await log_cb("warn", "Build cancelled; terminating process")
             try:
-                return await asyncio.wait_for(proc.wait(), timeout=1)
+                await asyncio.wait_for(asyncio.shield(wait_task), timeout=10)
             except asyncio.TimeoutError:
-                pass
+                proc.kill()
+            return -1
+        # Readers stop on EOF once the process exits; drain them so trailing lines are not lost
+        await asyncio.gather(*readers)
+        drained = True
+        return wait_task.result()
     finally:
-        for t in readers:
-            t.cancel()
+        cancel_task.cancel()
+        if proc.returncode is None:
+            # Killed after the grace period, or this task was cancelled (e.g. runner timeout)
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+        if not drained:
+            for t in readers:
+                t.cancel()
+            await asyncio.gather(*readers, return_exceptions=True)
+        # Reap the child so no zombie outlives the build
+        await asyncio.gather(wait_task, return_exceptions=True)
+
+
+def _scan_names(p: Path) -> Set[str]:
+    try:
+        with os.scandir(p) as it:
+            return {e.name for e in it}
+    except OSError:
+        return set()
+
+
+async def _listdir_set(p: Path) -> Set[str]:
+    """Names of the entries directly under p, listed off the event loop in a single scandir."""
+    return await asyncio.to_thread(_scan_names, p)
 
 
-def _detect_entry(workdir: Path, start_command: str) -> Optional[str]:
-    parts = shlex.split(start_command or "")
+@lru_cache(maxsize=256)
+def _pkg_fields(raw: bytes) -> Tuple[Optional[str], Optional[str]]:
+    """Return (bin, main) string fields of a package.json.
+
+    Keyed by file content rather than path/mtime: every build runs in a fresh sandbox copy,
+    so rebuilds of the same project only hit the cache when the bytes match.
+    """
+    try:
+        data = json.loads(raw.decode("utf-8"))
+    except Exception:
+        return None, None
+    if not isinstance(data, dict):
+        return None, None
+    bin_ = data.get("bin") if isinstance(data.get("bin"), str) else None
+    main = data.get("main") if isinstance(data.get("main"), str) else None
+    return bin_ or None, main or None
+
+
+def _detect_entry(workdir: Path, start_command: str, names: Optional[Set[str]] = None) -> Optional[str]:
+    # Plain str.split matches shlex for the common unquoted form; only pay for shlex when quoting/escapes appear
+    if not start_command:
+        parts = []
+    elif '"' in start_command or "'" in start_command or "\\" in start_command:
+        parts = shlex.split(start_command)
+    else:
+        parts = start_command.split()
     if parts and parts[0] in {"node", "node.exe"} and len(parts) >= 2:
         return parts[1]
+    if names is None:
+        names = _scan_names(workdir)
     pj = workdir / "package.json"
-    if pj.exists():
+    if "package.json" in names:
         try:
-            data = json.loads(pj.read_text(encoding="utf-8"))
-            if data.get("bin") and isinstance(data["bin"], str):
-                return data["bin"]
-            if data.get("main") and isinstance(data["main"], str):
-                return data["main"]
+            bin_, main = _pkg_fields(pj.read_bytes())
+            if bin_:
+                return bin_
+            if main:
+                return main
         except Exception:
             pass
     # Fallbacks
-    for name in ["index.js", "server.js", "app.js", "main.js"]:
-        if (workdir / name).exists():
-            return name
-    return None
+    return next((n for n in ("index.js", "server.js", "app.js", "main.js") if n in names), None)
+
+
+def _deps_hash(workdir: Path, toolchain: str) -> str:
+    """node_modules cache key: package.json + package-lock.json content plus the Node ABI/platform and npm major."""
+    h = hashlib.sha256(toolchain.encode())
+    for name in ("package.json", "package-lock.json"):
+        p = workdir / name
+        if p.exists():
+            h.update(name.encode())
+            h.update(p.read_bytes())
+    return h.hexdigest()
+
+
+async def _toolchain_tag(env: Dict[str, str], cwd: Path) -> str:
+    """Node version, platform, arch and module ABI plus the npm major, so native addons never cross Node ABIs."""
+    async def out(cmd: List[str]) -> str:
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, cwd=str(cwd), env=env,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+            )
+            stdout, _ = await proc.communicate()
+            return stdout.decode(errors="ignore").strip() if proc.returncode == 0 else ""
+        except Exception:
+            return ""
+    node, npm = await asyncio.gather(
+        out([_resolve("node"), "-p", "[process.version, process.platform, process.arch, process.versions.modules].join(' ')"]),
+        out([_resolve("npm"), "--version"]),
+    )
+    return f"{node} npm{npm.split('.')[0]}"
+
+
+def _restore_node_modules(cached: Path, workdir: Path) -> None:
+    """Copy a cached node_modules into workdir; a link would let build/postinstall scripts write into the shared entry."""
+    dst = workdir / "node_modules"
+    if dst.is_symlink() or dst.is_file():
+        dst.unlink()
+    elif dst.exists():
+        shutil.rmtree(dst, ignore_errors=True)
+    shutil.copytree(cached, dst, symlinks=True)
+
+
+def _store_node_modules(src: Path, cache_entry: Path) -> None:
+    """Copy node_modules into the cache, publishing it atomically under its hash."""
+    tmp = cache_entry.with_name(f"{cache_entry.name}.tmp{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    shutil.copytree(src, tmp / "node_modules", symlinks=True)
+    try:
+        tmp.rename(cache_entry)
+    except OSError:
+        # Another build published the same hash first
+        shutil.rmtree(tmp, ignore_errors=True)
 
 
 async def build_node(workdir: Path, project_name: str, build_id: str, request, log_cb, timeout_seconds: int, cancel_event) -> List[str]:
-    env = os.environ.copy()
+    env = _base_env()
+    # Persist pkg's prebuilt Node runtimes and npm's package cache (also used by npx) across builds
+    cache_base = Path.home() / ".forgex" / "cache"
+    env.setdefault("PKG_CACHE_PATH", os.getenv("FORGEX_PKG_CACHE") or str(cache_base / "pkg"))
+    env.setdefault("npm_config_cache", os.getenv("FORGEX_NPM_CONFIG_CACHE") or str(cache_base / "npm"))
+    env.setdefault("npm_config_update_notifier", "false")
+    for key in ("PKG_CACHE_PATH", "npm_config_cache"):
+        try:
+            Path(env[key]).mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            await log_cb("warn", f"Could not create {key} at {env[key]}: {e}")
     dist_dir = workdir / "dist"
     dist_dir.mkdir(parents=True, exist_ok=True)
 
-    # Install dependencies if package.json
-    if (workdir / "package.json").exists():
-        await log_cb("info", "Installing npm dependencies")
-        code = await _run_and_stream(["npm", "install"], env, workdir, log_cb, timeout_seconds, cancel_event)
-        if code != 0:
-            return []
+    # One directory listing serves the package.json/lockfile checks and entry fallbacks
+    names = await _listdir_set(workdir)
 
-    entry = _detect_entry(workdir, getattr(request, 'start_command', '') or '')
+    # Entry detection only reads package.json and top-level names, so resolve it before the
+    # (slow) install and fail fast instead of installing dependencies for a build that can't proceed
+    entry = await asyncio.to_thread(_detect_entry, workdir, getattr(request, 'start_command', '') or '', names)
     if not entry:
         await log_cb("error", "Could not determine Node.js entry. Provide start_command like 'node server.js' or ensure package.json has main/bin.")
         return []
 
+    # Install dependencies if package.json
+    if "package.json" in names:
+        # Optional node_modules cache keyed by package.json + package-lock.json and the Node/npm toolchain (enabled via FORGEX_NPM_CACHE)
+        cache_root = os.getenv("FORGEX_NPM_CACHE")
+        cache_entry: Optional[Path] = None
+        if cache_root:
+            try:
+                tag = await _toolchain_tag(env, workdir)
+                cache_entry = Path(cache_root) / await asyncio.to_thread(_deps_hash, workdir, tag)
+                await asyncio.to_thread(cache_entry.parent.mkdir, parents=True, exist_ok=True)
+            except Exception as e:
+                await log_cb("warn", f"node_modules cache disabled: {e}")
+                cache_entry = None
+        if cache_entry is not None and (cache_entry / "node_modules").is_dir():
+            await log_cb("info", f"Reusing cached node_modules ({cache_entry.name[:12]})")
+            await asyncio.to_thread(_restore_node_modules, cache_entry / "node_modules", workdir)
+        else:
+            await log_cb("info", "Installing npm dependencies")
+            npm_flags = ["--prefer-offline", "--no-audit", "--no-fund"]
+            if "package-lock.json" in names:
+                # Clean, lockfile-driven install without re-resolving the tree
+                code = await _run_and_stream([_resolve("npm"), "ci", *npm_flags], env, workdir, log_cb, timeout_seconds, cancel_event)
+                if code != 0 and not cancel_event.is_set():
+                    await log_cb("warn", "npm ci failed (lockfile out of sync?); retrying with npm install")
+                    code = await _run_and_stream([_resolve("npm"), "install", *npm_flags], env, workdir, log_cb, timeout_seconds, cancel_event)
+            else:
+                code = await _run_and_stream([_resolve("npm"), "install", *npm_flags], env, workdir, log_cb, timeout_seconds, cancel_event)
+            if code != 0:
+                return []
+            if cache_entry is not None and (workdir / "node_modules").is_dir():
+                try:
+                    await asyncio.to_thread(_store_node_modules, workdir / "node_modules", cache_entry)
+                    await log_cb("debug", f"Cached node_modules under {cache_entry}")
+                except Exception as e:
+                    await log_cb("warn", f"Failed to cache node_modules: {e}")
+
     # Build single binary using pkg (Linux host default)
     safe_name = (getattr(request, 'output_name', None) or Path(project_name).stem).replace(' ', '_')
     out_path = dist_dir / safe_name
     target = os.getenv('FORGEX_NODE_TARGET') or 'node20-linux-x64'
 
     await log_cb("info", f"Packaging with pkg -> target={target}")
-    code = await _run_and_stream(["npx", "-y", "pkg", entry, "--targets", target, "--output", str(out_path)], env, workdir, log_cb, timeout_seconds, cancel_event)
+    code = await _run_and_stream([_resolve("npx"), "-y", "pkg", entry, "--targets", target, "--output", str(out_path)], env, workdir, log_cb, timeout_seconds, cancel_event)
     if code != 0:
         return []
 
@@ -1,12 +1,235 @@
 from __future__ import annotations
+import ast
+import hashlib
 import os
+import re
 import shlex
+import shutil
+import uuid
 import asyncio
+from collections import deque
+from contextlib import nullcontext
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import AbstractSet, Dict, List, Optional, Sequence, Set, Tuple
 
 from backend.api.utils.security import validate_command
-from backend.api.utils.sandbox import ensure_venv_async
+from backend.api.utils.sandbox import ensure_shared_venv_async, ensure_venv_async
+
+# Prefer wheels (cache-friendly, no local builds) and never block on a prompt
+_PIP_INSTALL_FLAGS = ["--prefer-binary", "--no-input"]
+
+# Top-level import name -> PyPI package auto-installed when a project ships no requirements.txt
+_PKG_MAP = {"fastapi": "fastapi", "flask": "flask", "django": "django", "uvicorn": "uvicorn"}
+# Entry files larger than this skip AST parsing and use the substring heuristic
+_AST_MAX_BYTES = 1 << 20
+
+# Directories never searched for entry scripts or .env files
+_EXCLUDED_DIRS = frozenset({'.venv', 'venv', 'env', 'node_modules', 'dist', 'build', '__pycache__', '.git'})
+
+# Serialises build-tool installs into the FORGEX_SHARED_VENV venv across concurrent builds
+_SHARED_VENV_INSTALL_LOCK = asyncio.Lock()
+
+# Merges argv[1] (File Explorer, 48-256px) and argv[2] (Task Manager, 16-32px) into one multi-size .ico at argv[3];
+# runs in the build venv like _ICON_CONV_CODE. Frames are PNG-compressed and the ICO directory is written by hand.
+_ICON_MERGE_CODE = """\
+import io, sys
+from PIL import Image
+explorer_im = Image.open(sys.argv[1]).convert('RGBA')
+taskmanager_im = Image.open(sys.argv[2]).convert('RGBA')
+blobs = []
+for s in (16, 20, 24, 32, 48, 64, 128, 256):
+    base = taskmanager_im if s <= 32 else explorer_im
+    bio = io.BytesIO(); base.resize((s, s), Image.LANCZOS).save(bio, format='PNG')
+    blobs.append((s, bio.getvalue()))
+with open(sys.argv[3], 'wb') as f:
+    f.write(b'\\x00\\x00\\x01\\x00' + len(blobs).to_bytes(2, 'little'))  # reserved, type = 1 (icon), count
+    offset = 6 + 16 * len(blobs)
+    for s, data in blobs:
+        d = 0 if s >= 256 else s
+        f.write(bytes([d, d, 0, 0]) + (1).to_bytes(2, 'little') + (32).to_bytes(2, 'little'))  # planes, bit count
+        f.write(len(data).to_bytes(4, 'little') + offset.to_bytes(4, 'little'))
+        offset += len(data)
+    for _, data in blobs:
+        f.write(data)
+"""
+
+# PyInstaller version per (interpreter path, mtime_ns); the obfuscation step probes it at most once per venv
+_PYI_VERSION_CACHE: Dict[Tuple[str, int], str] = {}
+
+# Converts argv[1] to a multi-size .ico at argv[2]; runs in the build venv, where Pillow is installed
+_ICON_CONV_CODE = (
+    "from PIL import Image; import sys; "
+    "im=Image.open(sys.argv[1]); "
+    "sizes=[(256,256),(128,128),(64,64),(32,32),(16,16)]; "
+    "im.save(sys.argv[2], sizes=sizes)"
+)
+
+# Windows helper scripts written next to the EXE; only the exe name, log file and pause vary
+_PS_TEMPLATE = (
+    "$ErrorActionPreference = 'Stop'\n"
+    "$exe = Join-Path $PSScriptRoot '%s'\n"
+    "try { Unblock-File -Path $exe -ErrorAction SilentlyContinue } catch {}\n"
+    "Push-Location $PSScriptRoot\n"
+    "& $exe\n"
+    "$code = $LASTEXITCODE\n"
+    "Pop-Location\n"
+    "exit $code\n"
+).encode('utf-8')
+_CMD_LOG = (
+    "@echo off\r\n"
+    "setlocal\r\n"
+    "set SCRIPT=%~dp0%~n0.ps1\r\n"
+    "set LOG=%~dp0{log}\r\n"
+    "echo [%DATE% %TIME%] Launching >> \"%LOG%\"\r\n"
+    "powershell -NoProfile -ExecutionPolicy Bypass -File \"%SCRIPT%\" >> \"%LOG%\" 2>&1\r\n"
+    "set RC=%ERRORLEVEL%\r\n"
+    "echo [%DATE% %TIME%] Exit %RC% >> \"%LOG%\"\r\n"
+    "exit /b %RC%\r\n"
+)
+_CMD_NOLOG = (
+    "@echo off\r\n"
+    "setlocal\r\n"
+    "set SCRIPT=%~dp0%~n0.ps1\r\n"
+    "powershell -NoProfile -ExecutionPolicy Bypass -File \"%SCRIPT%\"\r\n"
+    "set RC=%ERRORLEVEL%\r\n"
+    "if not \"%RC%\"==\"0\" (\r\n"
+    "  echo Error launching app (code %RC%).\r\n"
+    "  timeout /t 8 /nobreak >nul\r\n"
+    ")\r\n"
+    "if \"%RC%\"==\"0\" (\r\n"
+    "  timeout /t 8 /nobreak >nul\r\n"
+    ")\r\n"
+)
+# (win_helper_log, pause_on_exit) -> .cmd skeleton; only {log} and {secs} are filled per build
+_CMD_VARIANTS = {
+    (has_log, has_pause): (_CMD_LOG if has_log else _CMD_NOLOG) + ("timeout /t {secs} /nobreak >nul\r\n" if has_pause else "")
+    for has_log in (False, True) for has_pause in (False, True)
+}
+
+
+# PyInstaller --version-file resource; only the display name ({desc}) and original filename vary (filled as repr literals)
+_VERSION_FILE_TEMPLATE = (
+    "# UTF-8\n"
+    "VSVersionInfo(\n"
+    "  ffi=FixedFileInfo(filevers=(1,0,0,0), prodvers=(1,0,0,0), mask=0x3f, flags=0x0, OS=0x4, fileType=0x1, subtype=0x0, date=(0, 0)),\n"
+    "  kids=[\n"
+    "    StringFileInfo([\n"
+    "      StringTable('040904B0', [\n"
+    "        StringStruct('CompanyName', ' '),\n"
+    "        StringStruct('FileDescription', {desc}),\n"
+    "        StringStruct('FileVersion', '1.0.0.0'),\n"
+    "        StringStruct('InternalName', {desc}),\n"
+    "        StringStruct('OriginalFilename', {original}),\n"
+    "        StringStruct('ProductName', {desc}),\n"
+    "        StringStruct('ProductVersion', '1.0.0.0'),\n"
+    "      ])\n"
+    "    ]),\n"
+    "    VarFileInfo([VarStruct('Translation', [1033, 1200])])\n"
+    "  ]\n"
+    ")\n"
+)
+
+
+@lru_cache(maxsize=256)
+def _render_helpers(exe_name: str, win_log: bool, log_name: Optional[str], pause_secs: Optional[int]) -> Tuple[bytes, bytes]:
+    """Encoded (.ps1, .cmd) helper scripts; pure, so identical helper options across builds are a cache hit."""
+    # Log filename: a specific name relative to script dir, else the script base name
+    cmd_code = _CMD_VARIANTS[(win_log, pause_secs is not None)].format_map(
+        {'log': log_name or '%~n0.log', 'secs': pause_secs}
+    )
+    return _PS_TEMPLATE % exe_name.encode('utf-8'), cmd_code.encode('utf-8')
+
+
+# Leading distribution name of each requirements.txt line, matched over the whole file in one pass.
+# Option lines (-r, -e), comments and paths fail the first character; the lookahead rejects the
+# scheme of a URL line (git+https:, http:) and lets specs, extras and markers follow the name.
+_REQ_NAME_RE = re.compile(r"(?m)^[ \t]*([A-Za-z0-9_][A-Za-z0-9_.-]*)(?![A-Za-z0-9_.+:-])")
+
+# Longest partial line buffered by the readers: PyInstaller/pip can print very long lines (module listings, tracebacks)
+_STREAM_LIMIT = 1 << 20
+
+# stderr line classification (PyInstaller/pip write INFO/WARNING lines to stderr); matched on raw bytes.
+# "info:" also covers PyInstaller's "123 INFO: ..." lines; order of the checks sets precedence.
+_INFO_LINE_RE = re.compile(rb"^INFO|(?i:info:)")
+_WARNING_LINE_RE = re.compile(rb"(?i)warning")
+_PIP_NOTICE_RE = re.compile(rb"(?i)a new release of pip is available|to update, run:")
+
+
+def _stderr_level(line: bytes) -> str:
+    """Level for a stderr line: info/warn for PyInstaller and pip chatter, error otherwise."""
+    if _INFO_LINE_RE.search(line):
+        return "info"
+    if _WARNING_LINE_RE.search(line):
+        return "warn"
+    if _PIP_NOTICE_RE.search(line):
+        return "info"
+    return "error"
+
+
+def _debug_enabled(log_cb) -> bool:
+    """False only when the callback says debug lines would be dropped (LogManager.make_log_cb)."""
+    return getattr(log_cb, 'debug_enabled', True)
+
+
+def _pinned(pkg: str, version_env: str) -> str:
+    """Return pkg pinned to the version in env var version_env (if set) so cached wheels hit deterministically."""
+    ver = (os.getenv(version_env) or '').strip()
+    return f"{pkg}=={ver}" if ver else pkg
+
+
+# PyInstaller runtime hooks, entry wrappers and build helpers shipped as plain files; static hooks are passed to --runtime-hook as-is
+_HOOK_DIR = Path(__file__).with_name("_pyi_hooks")
+_PARAMS_RE = re.compile(r"(?ms)^# --- forgex params ---\n.*?^# --- end forgex params ---\n")
+
+
+def _hook_path(name: str) -> Path:
+    return _HOOK_DIR / f"{name}.py"
+
+
+@lru_cache(maxsize=None)
+def _hook_source(name: str) -> str:
+    return _hook_path(name).read_text(encoding='utf-8')
+
+
+def _render_hook(name: str, **params) -> bytes:
+    """Encoded source of hook `name` with its params block replaced by the given values (runtime has no build env)."""
+    block = "".join(f"{k} = {v!r}\n" for k, v in params.items())
+    return _PARAMS_RE.sub(lambda _m: block, _hook_source(name), count=1).encode('utf-8')
+
+
+@lru_cache(maxsize=None)
+def _hook_defaults(name: str) -> Tuple[Tuple[str, object], ...]:
+    """The literal values a hook's shipped params block assigns, in order."""
+    m = _PARAMS_RE.search(_hook_source(name))
+    if not m:
+        return ()
+    tree = ast.parse(m.group(0))
+    return tuple((n.targets[0].id, ast.literal_eval(n.value)) for n in tree.body if isinstance(n, ast.Assign))
+
+
+def _runtime_hook(name: str, dest: Path, hook_files: Dict[Path, bytes], **params) -> Path:
+    """Path to pass to --runtime-hook: the shipped file when params match its defaults, else dest (queued in hook_files)."""
+    if tuple(params.items()) == _hook_defaults(name):
+        return _hook_path(name)
+    hook_files[dest] = _render_hook(name, **params)
+    return dest
+
+
+def _add_data(src, dest: str = ".") -> Tuple[str, str]:
+    """PyInstaller --add-data arguments; the separator is the build host's, whatever the target OS."""
+    return ("--add-data", f"{src}{os.pathsep}{dest}")
+
+
+def _write_files(files: Dict[Path, bytes]) -> List[Tuple[Path, OSError]]:
+    """Write every file (meant for asyncio.to_thread); returns the ones that failed instead of raising."""
+    failed: List[Tuple[Path, OSError]] = []
+    for path, data in files.items():
+        try:
+            path.write_bytes(data)
+        except OSError as e:
+            failed.append((path, e))
+    return failed
 
 
 def _find_openssl() -> Optional[str]:
@@ -61,11 +284,20 @@ def _find_signtool() -> Optional[str]:
     return which if which else None
 
 
-def _parse_entry_from_start(start_command: Optional[str]) -> Optional[str]:
+@lru_cache(maxsize=256)
+def _split_start_cmd(start_command: Optional[str]) -> Tuple[str, ...]:
+    """Tokens of start_command, split once per distinct command string."""
     if not start_command:
-        return None
-    parts = shlex.split(start_command)
-    if not parts:
+        return ()
+    # Plain str.split matches shlex for the common unquoted form; only pay for shlex when quoting/escapes appear
+    if '"' in start_command or "'" in start_command or "\\" in start_command:
+        return tuple(shlex.split(start_command))
+    return tuple(start_command.split())
+
+
+def _parse_entry_from_start(parts: Sequence[str]) -> Optional[str]:
+    # Every recognised form has at least two tokens
+    if len(parts) < 2:
         return None
     # Common patterns: "python app.py", "py app.py"
     if parts[0] in {"python", "py", "python3"} and len(parts) >= 2:
@@ -77,68 +309,361 @@ def _parse_entry_from_start(start_command: Optional[str]) -> Optional[str]:
         if script.endswith('.py'):
             return script
     # uvicorn main:app -> attempt mapping to main.py
-    if parts[0] == "uvicorn" and ":" in ''.join(parts[1:2]):
+    if parts[0] == "uvicorn" and ":" in parts[1]:
         mod = parts[1].split(":")[0]
         return mod.replace('.', '/') + ".py"
     return None
 
 
+def _scan_names(p: Path) -> Set[str]:
+    """Names of the entries directly under p (empty when it cannot be listed); meant for asyncio.to_thread."""
+    try:
+        with os.scandir(p) as it:
+            return {e.name for e in it}
+    except OSError:
+        return set()
+
+
+def _init_chain(workdir: Path, dirs: Sequence[str]) -> List[bool]:
+    """Whether each directory on the path workdir/dirs[0]/dirs[1]/... has an __init__.py."""
+    has_init: List[bool] = []
+    acc = workdir
+    for part in dirs:
+        acc = acc / part
+        has_init.append((acc / "__init__.py").is_file())
+    return has_init
+
+
+def _scan_entries(workdir: Path, wanted: Set[str], excluded: AbstractSet[str], max_py: int = 2) -> Tuple[Dict[str, str], List[str]]:
+    """Walk workdir once, pruning excluded directories before descending into them.
+
+    Returns ({basename: first match}, up to max_py *.py files) as os.sep-joined paths relative to workdir.
+    The walk is breadth-first so root-level files are always seen before nested ones, and it
+    stops early once every wanted name is found and max_py .py files have been seen.
+    DirEntry type checks come from readdir, so no file is stat'ed and no Path is built per entry.
+    """
+    found: Dict[str, str] = {}
+    py_files: List[str] = []
+    queue = deque([(os.fspath(workdir), "")])
+    while queue:
+        d, rel = queue.popleft()
+        try:
+            with os.scandir(d) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for e in entries:
+            try:
+                if e.is_dir(follow_symlinks=False):
+                    if e.name not in excluded:
+                        queue.append((e.path, rel + e.name + os.sep))
+                    continue
+                if not e.is_file():
+                    continue
+            except OSError:
+                continue
+            if e.name in wanted and e.name not in found:
+                found[e.name] = rel + e.name
+            if len(py_files) < max_py and e.name.endswith('.py'):
+                py_files.append(rel + e.name)
+        if len(found) == len(wanted) and len(py_files) >= max_py:
+            break
+    return found, py_files
+
+
 async def _run_and_stream(cmd: List[str], env: Dict[str, str], cwd: Path, log_cb, timeout: int, cancel_event: asyncio.Event) -> int:
     if not validate_command(cmd):
         await log_cb("error", f"Blocked command: {' '.join(cmd)}")
         return 2
-    await log_cb("debug", f"Running: {' '.join(shlex.quote(c) for c in cmd)}")
+    if _debug_enabled(log_cb):
+        await log_cb("debug", f"Running: {shlex.join(cmd)}")
     try:
         proc = await asyncio.create_subprocess_exec(
             *cmd,
             cwd=str(cwd),
             env=env,
+            stdin=asyncio.subprocess.DEVNULL,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
+            limit=_STREAM_LIMIT,
         )
     except FileNotFoundError:
         await log_cb("error", f"Command not found: {cmd[0]}")
         return 127
 
+    async def emit(line: bytes, level: str):
+        # Remap some stderr lines to appropriate levels (PyInstaller/pip often write INFO to stderr).
+        # Classify on bytes without a lower() copy and decode only once for the callback.
+        derived = _stderr_level(line) if level == "error" else level
+        await log_cb(derived, line.decode(errors='ignore').rstrip())
+
     async def reader(stream, level):
-        import re
+        # Read in large chunks and split locally; far fewer awaits than one readuntil() per line
+        buf = b""
         while True:
-            line = await stream.readline()
-            if not line:
+            chunk = await stream.read(65536)
+            if not chunk:
                 break
-            text = line.decode(errors='ignore').rstrip()
-            # Remap some stderr lines to appropriate levels (PyInstaller/pip often write INFO to stderr)
-            derived = level
-            low = text.lower()
-            if level == "error":
-                if ("info:" in low) or text.startswith("INFO") or re.search(r"^\s*\d+\s+INFO:\s*", text):
-                    derived = "info"
-                elif ("warning" in low) or text.startswith("WARNING"):
-                    derived = "warn"
-                # pip notices
-                elif "a new release of pip is available" in low or "to update, run:" in low:
-                    derived = "info"
-            await log_cb(derived, text)
+            *lines, buf = (buf + chunk).split(b"\n")
+            if len(buf) >= _STREAM_LIMIT:
+                # Over-long line with no newline yet: emit it in limit-sized pieces instead of buffering it all
+                lines.append(buf)
+                buf = b""
+            for line in lines:
+                await emit(line, level)
+        if buf:
+            await emit(buf, level)  # last line without a trailing newline
 
     readers = [asyncio.create_task(reader(proc.stdout, "info")), asyncio.create_task(reader(proc.stderr, "error"))]
 
+    # Sleep until the process exits or cancellation is signalled (no 1s polling)
+    wait_task = asyncio.create_task(proc.wait())
+    cancel_task = asyncio.create_task(cancel_event.wait())
+    drained = False
     try:
-        while True:
-            if cancel_event.is_set():
-                proc.terminate()
-                await log_cb("warn", "Build cancelled; terminating process")
-                try:
-                    await asyncio.wait_for(proc.wait(), timeout=10)
-                except asyncio.TimeoutError:
-                    proc.kill()
-                return -1
+        await asyncio.wait({wait_task, cancel_task}, return_when=asyncio.FIRST_COMPLETED)
+        if not wait_task.done():
+            proc.terminate()
+            await log_cb("warn", "Build cancelled; terminating process")
             try:
-                return await asyncio.wait_for(proc.wait(), timeout=1)
+                await asyncio.wait_for(asyncio.shield(wait_task), timeout=10)
             except asyncio.TimeoutError:
+                proc.kill()
+            return -1
+        # Readers stop on EOF once the process exits; drain them so trailing lines are not lost
+        await asyncio.gather(*readers)
+        drained = True
+        return wait_task.result()
+    finally:
+        cancel_task.cancel()
+        if proc.returncode is None:
+            # Killed after the grace period, or this task was cancelled (e.g. runner timeout)
+            try:
+                proc.kill()
+            except ProcessLookupError:
                 pass
+        if not drained:
+            for t in readers:
+                t.cancel()
+            await asyncio.gather(*readers, return_exceptions=True)
+        # Reap the child so no zombie outlives the build
+        await asyncio.gather(wait_task, return_exceptions=True)
+
+
+def _detect_framework_pkgs(ep: Path) -> Set[str]:
+    """PyPI packages from _PKG_MAP imported by the entry file.
+
+    Parses the file once with ast (ignoring mentions in comments/strings); oversized or
+    unparsable files fall back to a substring scan.
+    """
+    try:
+        raw = ep.read_bytes()
+    except Exception:
+        return set()
+    if len(raw) <= _AST_MAX_BYTES:
+        try:
+            roots: Set[str] = set()
+            for node in ast.walk(ast.parse(raw, filename=str(ep))):
+                if isinstance(node, ast.Import):
+                    roots.update(a.name.split('.')[0] for a in node.names)
+                elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                    roots.add(node.module.split('.')[0])
+            return {_PKG_MAP[r] for r in roots if r in _PKG_MAP}
+        except (SyntaxError, ValueError):
+            pass
+    low = raw.decode('utf-8', errors='ignore').lower()
+    return {pkg for mod, pkg in _PKG_MAP.items() if f'from {mod}' in low or f'import {mod}' in low}
+
+
+async def _missing_modules(py_bin: Path, modules: List[str], env: Dict[str, str], cwd: Path) -> Set[str]:
+    """Return the subset of modules that cannot be found by py_bin (one probe process, nothing imported)."""
+    if not modules:
+        return set()
+    probe = "import sys, importlib.util as u; print(' '.join(m for m in sys.argv[1:] if u.find_spec(m) is None))"
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            str(py_bin), "-c", probe, *modules,
+            cwd=str(cwd), env=env,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+        )
+        out, _ = await proc.communicate()
+        if proc.returncode != 0:
+            return set(modules)
+        return set(out.decode(errors='ignore').split())
+    except Exception:
+        return set(modules)
+
+
+async def _pyinstaller_version(py_bin: Path, env: Dict[str, str], cwd: Path) -> str:
+    """PyInstaller version installed for py_bin ("0.0" if unknown), memoised per interpreter path and mtime."""
+    try:
+        st = py_bin.stat()
+        key = (str(py_bin), st.st_mtime_ns)
+    except OSError:
+        key = None
+    if key in _PYI_VERSION_CACHE:
+        return _PYI_VERSION_CACHE[key]
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            str(py_bin), "-c", "import PyInstaller; print(getattr(PyInstaller,'__version__','0.0'))",
+            cwd=str(cwd), env=env,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+        )
+        out, _ = await proc.communicate()
+        if proc.returncode != 0:
+            return "0.0"
+    except Exception:
+        return "0.0"
+    version = out.decode(errors='ignore').strip() or "0.0"
+    if key is not None:
+        _PYI_VERSION_CACHE[key] = version
+    return version
+
+
+def _req_names(req: Path) -> List[str]:
+    """Distribution names listed in a requirements file (options, URLs, markers and specs dropped)."""
+    try:
+        text = req.read_text(encoding='utf-8', errors='ignore')
+    except OSError:
+        return []
+    return _REQ_NAME_RE.findall(text)
+
+
+async def _missing_dists(py_bin: Path, names: List[str], env: Dict[str, str], cwd: Path) -> Set[str]:
+    """Return the subset of distributions not installed for py_bin (one probe instead of a `pip show` each)."""
+    if not names:
+        return set()
+    probe = (
+        "import sys, importlib.metadata as m\n"
+        "for n in sys.argv[1:]:\n"
+        "    try: m.distribution(n)\n"
+        "    except m.PackageNotFoundError: print(n)\n"
+    )
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            str(py_bin), "-c", probe, *names,
+            cwd=str(cwd), env=env,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+        )
+        out, _ = await proc.communicate()
+        if proc.returncode != 0:
+            return set(names)
+        return set(out.decode(errors='ignore').split())
+    except Exception:
+        return set(names)
+
+
+async def _ensure_pkgs(py_bin: Path, pkgs: List[Tuple[str, str]], env: Dict[str, str], workdir: Path, log_cb, timeout: int, cancel_event: asyncio.Event, req_files: Sequence[Path] = (), pip_args: Sequence[str] = ()) -> int:
+    """Install only the (module, pip spec) pairs whose module is missing, plus any req_files, in a single pip call."""
+    missing = await _missing_modules(py_bin, [m for m, _ in pkgs], env, workdir)
+    specs = [spec for m, spec in pkgs if m in missing]
+    req_args = [arg for r in req_files for arg in ("-r", str(r))]
+    if not specs and not req_args:
+        await log_cb("debug", f"Already installed: {', '.join(spec for _, spec in pkgs)}")
+        return 0
+    return await _run_and_stream([str(py_bin), "-m", "pip", "install", *_PIP_INSTALL_FLAGS, *pip_args, *req_args, *specs], env, workdir, log_cb, timeout, cancel_event)
+
+
+async def _install_build_pkgs(py_bin: Path, pkgs: List[Tuple[str, str]], env: Dict[str, str], workdir: Path, log_cb, timeout: int, cancel_event: asyncio.Event, req_files: Sequence[Path] = ()) -> bool:
+    """Install pkgs (the required PyInstaller first, then optional extras) and req_files in one pip call.
+
+    A failed resolve installs nothing, so on failure the requirements, PyInstaller and each optional spec are
+    retried on their own; only the requirements or PyInstaller can fail the build (False).
+    """
+    if await _ensure_pkgs(py_bin, pkgs, env, workdir, log_cb, timeout, cancel_event, req_files) == 0:
+        return True
+    await log_cb("warn", "Combined install failed; retrying requirements and build packages separately")
+    for r in req_files:
+        if await _run_and_stream([str(py_bin), "-m", "pip", "install", *_PIP_INSTALL_FLAGS, "-r", str(r)], env, workdir, log_cb, timeout, cancel_event) != 0:
+            return False
+    required, *optional = pkgs
+    if await _ensure_pkgs(py_bin, [required], env, workdir, log_cb, timeout, cancel_event) != 0:
+        return False
+    await _install_each(py_bin, optional, env, workdir, log_cb, timeout, cancel_event)
+    return True
+
+
+async def _install_each(py_bin: Path, pkgs: Sequence[Tuple[str, str]], env: Dict[str, str], workdir: Path, log_cb, timeout: int, cancel_event: asyncio.Event, pip_args: Sequence[str] = ()) -> None:
+    """One pip call per optional (module, spec) so a bad spec only costs itself; failures are warnings."""
+    for pkg in pkgs:
+        if await _ensure_pkgs(py_bin, [pkg], env, workdir, log_cb, timeout, cancel_event, pip_args=pip_args) != 0:
+            await log_cb("warn", f"Optional build package {pkg[1]} failed to install; continuing")
+
+
+def _pause_seconds(request) -> Optional[int]:
+    """Pause-on-exit delay clamped to 1..120s (default 5), or None when pause_on_exit is off."""
+    if not getattr(request, 'pause_on_exit', False):
+        return None
+    secs = getattr(request, 'pause_on_exit_seconds', None)
+    try:
+        secs = int(secs) if secs is not None else 5
+    except (TypeError, ValueError):
+        secs = 5
+    return max(1, min(120, secs))
+
+
+def _needs_pillow(request) -> bool:
+    """Whether the icon step below will need Pillow (merge two icons, or convert a non-.ico icon for Windows)."""
+    if str(getattr(request, 'target_os', 'windows')).lower() != 'windows':
+        return False
+    icon = Path(request.icon_path) if getattr(request, 'icon_path', None) else None
+    proc_icon = Path(request.process_icon_path) if getattr(request, 'process_icon_path', None) else None
+    if proc_icon and icon and proc_icon.exists() and icon.exists():
+        return True
+    src = proc_icon or icon
+    return bool(src) and src.suffix.lower() not in {'.ico', '.exe'} and src.exists()
+
+
+def _encrypts_env(request) -> bool:
+    """Whether the .env step below will need cryptography (include_env with pyinstaller.protect.encrypt_env.enable)."""
+    if not getattr(request, 'include_env', False):
+        return False
+    opts = getattr(request, 'pyinstaller', None) or {}
+    prot = (opts.get('protect') or {}) if isinstance(opts, dict) else {}
+    env_enc = (prot.get('encrypt_env') or {}) if isinstance(prot, dict) else {}
+    return isinstance(env_enc, dict) and bool(env_enc.get('enable'))
+
+
+def _icon_cache_entry(src: Path) -> Optional[Path]:
+    """Cache slot for the .ico converted from src, keyed by the sha256 of its bytes (None if unreadable)."""
+    try:
+        with open(src, 'rb') as f:
+            key = hashlib.file_digest(f, 'sha256').hexdigest()
+    except OSError:
+        return None
+    return Path(os.getenv("FORGEX_ICON_CACHE") or (Path.home() / ".forgex" / "cache" / "icons")) / f"{key}.ico"
+
+
+def _icon_cache_publish(out_ico: Path, cached: Path) -> None:
+    # Copy to a unique temp name first so concurrent builds never see a half-written entry
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cached.with_name(f"{cached.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        shutil.copyfile(out_ico, tmp)
+        os.replace(tmp, cached)
     finally:
-        for t in readers:
-            t.cancel()
+        tmp.unlink(missing_ok=True)
+
+
+async def _convert_icon(py_bin: Path, src: Path, out_ico: Path, env: Dict[str, str], workdir: Path, log_cb, timeout: int, cancel_event: asyncio.Event) -> bool:
+    """Convert src to out_ico with Pillow, reusing the cached result of an earlier build of the same icon."""
+    cached = await asyncio.to_thread(_icon_cache_entry, src)
+    if cached is not None and cached.is_file():
+        try:
+            await asyncio.to_thread(shutil.copyfile, cached, out_ico)
+            await log_cb("debug", f"Icon cache hit: {cached}")
+            return True
+        except OSError:
+            pass
+    code = await _run_and_stream([str(py_bin), "-c", _ICON_CONV_CODE, str(src), str(out_ico)], env, workdir, log_cb, timeout, cancel_event)
+    if code != 0 or not out_ico.exists():
+        return False
+    if cached is not None:
+        try:
+            await asyncio.to_thread(_icon_cache_publish, out_ico, cached)
+        except OSError as e:
+            await log_cb("debug", f"Icon cache unavailable ({cached.parent}): {e}")
+    return True
 
 
 async def build_python(workdir: Path, project_name: str, build_id: str, request, log_cb, timeout_seconds: int, cancel_event: asyncio.Event) -> List[str]:
@@ -147,123 +672,110 @@ async def build_python(workdir: Path, project_name: str, build_id: str, request,
     offline = bool(getattr(request, 'offline_build', False))
     # Defer extra PyInstaller args here so early phases can append before build_cmd exists
     pyi_extras: List[str] = []
+    # Extra pip args for project requirements; a shared venv redirects them into a per-build overlay
+    pip_target: List[str] = []
+    # One listing of the project root answers the requirements.txt/.env checks below off the event loop
+    root_names = await asyncio.to_thread(_scan_names, workdir)
+    # Determine entry first, so a project without one fails before any venv or pip work
+    start_parts = _split_start_cmd(getattr(request, 'start_command', None))
+    entry: Optional[str] = _parse_entry_from_start(start_parts)
+    # One pruned walk serves the start-command basename lookup and all fallbacks below
+    entry_names = ["app.py", "main.py", "run.py", "manage.py", "index.py"]
+    scan: Optional[Tuple[Dict[str, str], List[str]]] = None
+    if not (entry and (workdir / entry).exists()):
+        wanted = set(entry_names)
+        if entry:
+            wanted.add(Path(entry).name)
+        scan = await asyncio.to_thread(_scan_entries, workdir, wanted, _EXCLUDED_DIRS)
+    if entry and scan is not None:
+        # Try to find by basename anywhere under workdir (excluding venv/node_modules/etc.)
+        match = scan[0].get(Path(entry).name)
+        entry = match or None
+    if not entry and scan is not None:
+        found, py_files = scan
+        # Fallback to common names in root first
+        entry = next((name for name in entry_names if name in found and os.sep not in found[name]), None)
+        if not entry:
+            # Then common names anywhere, excluding heavy/venv dirs
+            entry = next((found[name] for name in entry_names if name in found), None)
+        if not entry and len(py_files) == 1:
+            # As a last resort, if the project contains exactly one .py file, use it (excluding venv/node_modules)
+            entry = py_files[0]
+    if not entry:
+        await log_cb("error", "Could not determine Python entry script. Provide start_command (e.g. 'python your_script.py') or ensure one of app.py/main.py exists.")
+        return []
+    await log_cb("debug", f"Entry script: {entry}")
+    entry_path = workdir / entry  # already workdir-relative; resolve() would only add lstat/readlink calls
+    # Listing of the entry's folder: package marker, local requirements.txt and .env checks below
+    entry_dir_names = root_names if entry_path.parent == workdir else await asyncio.to_thread(_scan_names, entry_path.parent)
+
+    shared_venv = (os.getenv("FORGEX_SHARED_VENV") or "").strip()
+    # One copy of the environment per build; the venv branch adjusts it in place
+    env = dict(os.environ)
     if offline:
         await log_cb("info", "Offline build: using system Python/site-packages (no venv, no network installs)")
         venv_dir = None
         py_bin = Path(_sys.executable)
-        env = os.environ.copy()
         # Verify PyInstaller is available
         chk = await _run_and_stream([str(py_bin), "-c", "import PyInstaller"], env, workdir, log_cb, timeout_seconds, cancel_event)
         if chk != 0:
             await log_cb("error", "PyInstaller not available in system environment. Install it (pip install pyinstaller) or disable Offline build.")
             return []
     else:
-        await log_cb("debug", f"Creating venv in {workdir / '.venv'}")
-        venv_dir, py_bin, pip_bin = await ensure_venv_async(workdir)
-        env = os.environ.copy()
+        if shared_venv:
+            # Build tools live in one venv reused by every build; requirements go to an overlay
+            # under .venv (which entry/.env scans already skip) that is put on PYTHONPATH
+            await log_cb("debug", f"Using shared build venv {shared_venv}")
+            venv_dir, py_bin, pip_bin = await ensure_shared_venv_async(Path(shared_venv).expanduser())
+            overlay = workdir / ".venv" / "site-packages"
+            overlay.mkdir(parents=True, exist_ok=True)
+            pip_target = ["--target", str(overlay)]
+            env["PYTHONPATH"] = os.pathsep.join(p for p in (str(overlay), env.get("PYTHONPATH")) if p)
+        else:
+            await log_cb("debug", f"Creating venv in {workdir / '.venv'}")
+            venv_dir, py_bin, pip_bin = await ensure_venv_async(workdir)
         env["VIRTUAL_ENV"] = str(venv_dir)
         env["PATH"] = f"{venv_dir / ('Scripts' if os.name=='nt' else 'bin')}{os.pathsep}" + env.get("PATH", "")
+        # Shared wheel/download cache so every fresh .venv reuses packages fetched by earlier builds
+        pip_cache = Path(os.getenv("FORGEX_PIP_CACHE") or (Path.home() / ".forgex" / "cache" / "pip"))
+        try:
+            pip_cache.mkdir(parents=True, exist_ok=True)
+            env.setdefault("PIP_CACHE_DIR", str(pip_cache))
+        except Exception as e:
+            await log_cb("warn", f"pip cache unavailable ({pip_cache}): {e}")
 
     # Install deps if requirements.txt exists (skip in offline mode)
     req = workdir / "requirements.txt"
-    if offline and req.exists():
+    has_req = "requirements.txt" in root_names
+    if offline and has_req:
         # Verify required packages are available system-wide (no network installs)
-        import re as _re
-        def _parse_pkg(line: str) -> str:
-            s = line.strip()
-            # drop markers and hashes
-            s = s.split(';', 1)[0].split('#', 1)[0].strip()
-            if not s or s.startswith(('-', 'git+', 'http:', 'https:')):
-                return ''
-            # extract name before version spec/extras
-            m = _re.match(r"^[A-Za-z0-9_.-]+", s)
-            return m.group(0) if m else ''
-        missing = []
-        try:
-            for raw in req.read_text(encoding='utf-8', errors='ignore').splitlines():
-                name = _parse_pkg(raw)
-                if not name:
-                    continue
-                rc = await _run_and_stream([str(py_bin), "-m", "pip", "show", name], env, workdir, lambda lvl, msg: None, timeout_seconds, cancel_event)
-                if rc != 0:
-                    missing.append(name)
-        except Exception:
-            pass
+        missing = await _missing_dists(py_bin, _req_names(req), env, workdir)
         if missing:
-            await log_cb('error', f"Offline build: missing required packages: {', '.join(sorted(set(missing)))}. Install them system-wide or disable Offline build.")
-            return []
-    if not offline and req.exists():
-        await log_cb("debug", f"Installing requirements from {req}")
-        code = await _run_and_stream([str(py_bin), "-m", "pip", "install", "-r", str(req)], env, workdir, log_cb, timeout_seconds, cancel_event)
-        if code != 0:
+            await log_cb('error', f"Offline build: missing required packages: {', '.join(sorted(missing))}. Install them system-wide or disable Offline build.")
             return []
-    # Ensure pyinstaller available (only in venv mode)
-    if not offline:
-        await log_cb("info", "Installing PyInstaller (this may take a few minutes)...")
-        code = await _run_and_stream([str(py_bin), "-m", "pip", "install", "pyinstaller"], env, workdir, log_cb, timeout_seconds, cancel_event)
-        if code != 0:
-            return []
-        # Best-effort ensure python-dotenv so the runtime hook can load .env automatically
-        await log_cb("debug", "Ensuring python-dotenv is installed (optional)")
-        _ = await _run_and_stream([str(py_bin), "-m", "pip", "install", "python-dotenv"], env, workdir, log_cb, timeout_seconds, cancel_event)
-
-    # Determine entry
-    entry: Optional[str] = _parse_entry_from_start(request.start_command)
-    EXCLUDED_DIRS = {'.venv', 'venv', 'env', 'node_modules', 'dist', 'build', '__pycache__', '.git'}
-    def _is_excluded(path: Path) -> bool:
-        # Exclude paths that pass through known heavy directories
-        return any(part in EXCLUDED_DIRS for part in path.parts)
-    def _is_excluded_dir(path: Path) -> bool:
-        # Exclude only by parent directories; never exclude by file name
-        return any(part in EXCLUDED_DIRS for part in path.parent.parts)
-
-    if entry:
-        cand = workdir / entry
-        if not cand.exists():
-            # Try to find by basename anywhere under workdir (excluding venv/node_modules/etc.)
-            target = Path(entry).name
-            match = next((p for p in workdir.rglob(target) if p.is_file() and not _is_excluded(p)), None)
-            if match:
-                entry = str(match.relative_to(workdir))
-            else:
-                entry = None
-    if not entry:
-        # Fallback to common names in root first
-        for name in ["app.py", "main.py", "run.py", "manage.py", "index.py"]:
-            if (workdir / name).exists():
-                entry = name
-                break
-    if not entry:
-        # Search common names recursively excluding heavy/venv dirs
-        for name in ["app.py", "main.py", "run.py", "manage.py", "index.py"]:
-            candidates = [p for p in workdir.rglob(name) if p.is_file() and not _is_excluded(p)]
-            if candidates:
-                entry = str(candidates[0].relative_to(workdir))
-                break
-    if not entry:
-        # As a last resort, if the project contains exactly one .py file, use it (excluding venv/node_modules)
-        py_files = [p for p in workdir.rglob('*.py') if p.is_file() and not _is_excluded(p)]
-        if len(py_files) == 1:
-            entry = str(py_files[0].relative_to(workdir))
-    if not entry:
-        await log_cb("error", "Could not determine Python entry script. Provide start_command (e.g. 'python your_script.py') or ensure one of app.py/main.py exists.")
-        return []
-    await log_cb("debug", f"Entry script: {entry}")
+    # Requirements for a per-build venv are folded into the build-package pip call further down, so
+    # pip resolves everything in one pass; the shared-venv overlay needs --target and installs now
+    deferred_reqs: List[Path] = []
+    if not offline and has_req:
+        if pip_target:
+            await log_cb("debug", f"Installing requirements from {req}")
+            code = await _run_and_stream([str(py_bin), "-m", "pip", "install", *_PIP_INSTALL_FLAGS, *pip_target, "-r", str(req)], env, workdir, log_cb, timeout_seconds, cancel_event)
+            if code != 0:
+                return []
+        else:
+            deferred_reqs.append(req)
 
     # Optional CLI wrapper for uvicorn to preserve host/port and other args from start_command
     entry_for_build: Optional[str] = None
     try:
-        sc = (getattr(request, 'start_command', '') or '').strip()
-        parts_sc = shlex.split(sc) if sc else []
-        if parts_sc and parts_sc[0].lower() == 'uvicorn':
-            uv_args = parts_sc[1:]
+        if start_parts and start_parts[0].lower() == 'uvicorn':
+            uv_args = list(start_parts[1:])
             # Decide packaging and import hints based on entry path
             try:
                 if entry:
                     from pathlib import Path as _P
-                    ep = (_P(workdir) / entry)
-                    parent = ep.parent
-                    is_pkg = (parent / "__init__.py").exists()
+                    parent = entry_path.parent
+                    is_pkg = "__init__.py" in entry_dir_names
                     target = (uv_args[0] or '') if uv_args else ''
                     app_attr = (target.split(':', 1)[1] if ':' in target else 'app') or 'app'
                     if not is_pkg:
@@ -300,35 +812,8 @@ async def build_python(workdir: Path, project_name: str, build_id: str, request,
             except Exception:
                 pass
             wrapper_uv = workdir / "forgex_uvicorn_entry.py"
-            code = (
-                "# Auto-generated by ForgeX to run uvicorn safely in windowless builds\n"
-                "import sys, os, logging, logging.config\n"
-                "from pathlib import Path\n"
-                "# Ensure stdio streams exist under --noconsole (need real fds)\n"
-                "if getattr(sys, 'stdin', None) is None: sys.stdin = open(os.devnull, 'r')\n"
-                "if getattr(sys, 'stdout', None) is None: sys.stdout = open(os.devnull, 'a', buffering=1)\n"
-                "if getattr(sys, 'stderr', None) is None: sys.stderr = open(os.devnull, 'a', buffering=1)\n"
-                "from uvicorn import main as _uv_main\n"
-                "_exe = getattr(sys, 'executable', None) or 'app'\n"
-                "_log_file = Path(_exe).with_suffix('.log')\n"
-                "_cfg = {\n"
-                "  'version': 1,\n"
-                "  'formatters': { 'basic': { '()': 'logging.Formatter', 'format': '%(asctime)s %(levelname)s [%(name)s] %(message)s' } },\n"
-                "  'handlers': { 'file': { 'class': 'logging.FileHandler', 'filename': str(_log_file), 'encoding': 'utf-8', 'formatter': 'basic' } },\n"
-                "  'root': { 'handlers': ['file'], 'level': 'INFO' },\n"
-                "  'loggers': { 'uvicorn': { 'handlers': ['file'], 'level': 'INFO', 'propagate': False }, 'uvicorn.error': { 'handlers': ['file'], 'level': 'INFO', 'propagate': False }, 'uvicorn.access': { 'handlers': ['file'], 'level': 'INFO', 'propagate': False } }\n"
-                "}\n"
-                "try:\n"
-                "  logging.config.dictConfig(_cfg)\n"
-                "except Exception:\n"
-                "  pass\n"
-                f"sys.argv = ['uvicorn'" + ("" if not uv_args else ", " + ", ".join(repr(a) for a in uv_args)) + "]\n"
-                "# Force-disable auto-reload in packaged executable to avoid stdio issues\n"
-                "sys.argv = [a for a in sys.argv if not (a == '--reload' or a.startswith('--reload-dir'))]\n"
-                "_uv_main()\n"
-            )
             try:
-                wrapper_uv.write_text(code, encoding='utf-8')
+                await asyncio.to_thread(wrapper_uv.write_bytes, _render_hook("uvicorn_entry", _UV_ARGS=list(uv_args)))
                 entry_for_build = str(wrapper_uv)
                 await log_cb("debug", f"Using uvicorn CLI wrapper with args: {' '.join(uv_args)}")
             except Exception as e:
@@ -337,41 +822,23 @@ async def build_python(workdir: Path, project_name: str, build_id: str, request,
         await log_cb("warn", f"uvicorn wrapper setup skipped: {e}")
 
     # If the entry lives in a subfolder, also install requirements from that folder if present
-    try:
-        entry_path = (workdir / entry).resolve()
-    except Exception:
-        entry_path = (workdir / entry)
     local_req = entry_path.parent / "requirements.txt"
+    has_local_req = "requirements.txt" in entry_dir_names and str(local_req) != str(req)
     try:
-        if offline and local_req.exists() and str(local_req) != str(req):
+        if offline and has_local_req:
             # Verify local requirements in offline mode
-            import re as _re
-            def _parse_pkg(line: str) -> str:
-                s = line.strip()
-                s = s.split(';', 1)[0].split('#', 1)[0].strip()
-                if not s or s.startswith(('-', 'git+', 'http:', 'https:')):
-                    return ''
-                m = _re.match(r"^[A-Za-z0-9_.-]+", s)
-                return m.group(0) if m else ''
-            missing = []
-            try:
-                for raw in local_req.read_text(encoding='utf-8', errors='ignore').splitlines():
-                    name = _parse_pkg(raw)
-                    if not name:
-                        continue
-                    rc = await _run_and_stream([str(py_bin), "-m", "pip", "show", name], env, workdir, lambda lvl, msg: None, timeout_seconds, cancel_event)
-                    if rc != 0:
-                        missing.append(name)
-            except Exception:
-                pass
+            missing = await _missing_dists(py_bin, _req_names(local_req), env, workdir)
             if missing:
-                await log_cb('error', f"Offline build: missing local requirements: {', '.join(sorted(set(missing)))}. Install them system-wide or disable Offline build.")
-                return []
-        if not offline and local_req.exists() and str(local_req) != str(req):
-            await log_cb("debug", f"Installing requirements from {local_req}")
-            code = await _run_and_stream([str(py_bin), "-m", "pip", "install", "-r", str(local_req)], env, workdir, log_cb, timeout_seconds, cancel_event)
-            if code != 0:
+                await log_cb('error', f"Offline build: missing local requirements: {', '.join(sorted(missing))}. Install them system-wide or disable Offline build.")
                 return []
+        if not offline and has_local_req:
+            if pip_target:
+                await log_cb("debug", f"Installing requirements from {local_req}")
+                code = await _run_and_stream([str(py_bin), "-m", "pip", "install", *_PIP_INSTALL_FLAGS, *pip_target, "-r", str(local_req)], env, workdir, log_cb, timeout_seconds, cancel_event)
+                if code != 0:
+                    return []
+            else:
+                deferred_reqs.append(local_req)
     except Exception as e:
         await log_cb("warn", f"Failed to process local requirements: {e}")
 
@@ -380,20 +847,14 @@ async def build_python(workdir: Path, project_name: str, build_id: str, request,
     try:
         rel_no_ext = entry_path.with_suffix('').relative_to(workdir)
         parts = list(rel_no_ext.parts)
-        # Find highest package directory and ensure the chain has __init__.py
+        # Find highest package directory such that the chain down to the leaf has __init__.py:
+        # one is_file() per directory level, then take the start of the trailing run of packages
+        has_init = await asyncio.to_thread(_init_chain, workdir, parts[:-1]) if len(parts) > 1 else []
         top_idx = None
-        for i in range(len(parts) - 1):  # exclude the file leaf in package chain detection
-            pkg_dir = workdir.joinpath(*parts[: i + 1])
-            if (pkg_dir / "__init__.py").exists():
-                # verify that all dirs from i to leaf-1 are packages
-                ok = True
-                for j in range(i + 1, len(parts) - 1):
-                    if not (workdir.joinpath(*parts[: j + 1]) / "__init__.py").exists():
-                        ok = False
-                        break
-                if ok:
-                    top_idx = i
-                    break
+        for i in range(len(has_init) - 1, -1, -1):
+            if not has_init[i]:
+                break
+            top_idx = i
         if top_idx is not None:
             module_name = ".".join(parts[top_idx:])  # include leaf module
     except Exception:
@@ -407,98 +868,74 @@ async def build_python(workdir: Path, project_name: str, build_id: str, request,
         base_name = Path(project_name).stem.replace(' ', '_').replace('-', '_')
     safe_name = base_name
     dist_dir = workdir / "dist"
+    # Generated runtime hooks are collected here and written together, off the event loop, right
+    # before PyInstaller runs; a hook whose write fails is dropped from the command line
+    hook_files: Dict[Path, bytes] = {}
     # Create a runtime hook to auto-load .env (no logging)
-    hook_path = workdir / "forgex_env_auto.py"
-    try:
-        prefer_embed = bool(getattr(request, 'include_env', False))
-        hook_code = (
-            "try:\n"
-            "    import os, sys\n"
-            "    from pathlib import Path\n"
-            "    def _simple_load(path: Path):\n"
-            "        try:\n"
-            "            for line in path.read_text(encoding='utf-8', errors='ignore').splitlines():\n"
-            "                s=line.strip()\n"
-            "                if not s or s.startswith('#') or '=' not in s:\n"
-            "                    continue\n"
-            "                k,v=s.split('=',1)\n"
-            "                k=k.strip(); v=v.strip()\n"
-            "                if (v.startswith(\"'\") and v.endswith(\"'\")) or (v.startswith('\"') and v.endswith('\"')):\n"
-            "                    v = v[1:-1]\n"
-            "                if k and (k not in os.environ): os.environ[k]=v\n"
-            "        except Exception:\n"
-            "            pass\n"
-            f"    _PREFER_EMBED = {repr(prefer_embed)}\n"
-            "    cands = []\n"
-            "    if getattr(sys, 'frozen', False):\n"
-            "        mp = getattr(sys, '_MEIPASS', '')\n"
-            "        exe_dir = Path(sys.executable).parent\n"
-            "        if _PREFER_EMBED:\n"
-            "            # include_env=True: prefer embedded .env, then exe folder\n"
-            "            if mp: cands.append(Path(mp)/'.env')\n"
-            "            cands.append(exe_dir/'.env')\n"
-            "        else:\n"
-            "            # include_env=False: only look next to the EXE\n"
-            "            cands.append(exe_dir/'.env')\n"
-            "    else:\n"
-            "        cands.append(Path(__file__).parent/'.env')\n"
-            "    for p in cands:\n"
-            "        if p.exists(): _simple_load(p); break\n"
-            "except Exception:\n"
-            "    pass\n"
-        )
-        hook_path.write_text(hook_code, encoding='utf-8')
-    except Exception:
-        pass
+    hook_path = _runtime_hook("env_auto", workdir / "forgex_env_auto.py", hook_files,
+                              _PREFER_EMBED=bool(getattr(request, 'include_env', False)))
 
     build_cmd = [
         str(py_bin), "-m", "PyInstaller", "--onefile", "--name", safe_name,
     ]
-    build_cmd += ["--runtime-hook", str(hook_path)]
+    build_cmd.extend(("--runtime-hook", str(hook_path)))
     # Append any deferred extras (e.g., hidden-imports) gathered earlier
     if pyi_extras:
-        build_cmd += pyi_extras
+        build_cmd.extend(pyi_extras)
     # Ensure certifi CA bundle is packaged for HTTPS (Render, etc.)
     try:
-        build_cmd += ["--collect-data", "certifi"]
+        build_cmd.extend(("--collect-data", "certifi"))
     except Exception:
         pass
 
     # Best-effort: auto-install common web frameworks if requirements.txt is missing
     auto_pkgs: List[str] = []
-    if not (workdir / "requirements.txt").exists():
+    if not has_req:
         try:
             sc = (getattr(request, 'start_command', '') or '').lower()
             if 'uvicorn' in sc:
                 auto_pkgs.append('uvicorn')
-            ep = workdir / entry
-            code_txt = ep.read_text(encoding='utf-8', errors='ignore') if ep.exists() else ''
-            low = code_txt.lower()
-            if 'from fastapi' in low or 'import fastapi' in low:
-                auto_pkgs.append('fastapi')
-            if 'from flask' in low or 'import flask' in low:
-                auto_pkgs.append('flask')
-            if 'from django' in low or 'import django' in low:
-                auto_pkgs.append('django')
-            if auto_pkgs and not offline:
-                # de-duplicate
-                pkgs = sorted(set(auto_pkgs))
-                await log_cb('info', f"Installing runtime packages: {', '.join(pkgs)} (this may take a while)...")
-                code = await _run_and_stream([str(py_bin), '-m', 'pip', 'install', *pkgs], env, workdir, log_cb, timeout_seconds, cancel_event)
-                if code != 0:
-                    await log_cb('warn', 'Auto-install of detected packages failed; continuing')
-            elif auto_pkgs and offline:
+            if entry_path.name in entry_dir_names:
+                auto_pkgs.extend(await asyncio.to_thread(_detect_framework_pkgs, entry_path))
+            if auto_pkgs and offline:
                 await log_cb('info', 'Offline build: skipping auto-install of detected packages; ensure they are available system-wide')
         except Exception as e:
             await log_cb('warn', f'Auto-detect install step skipped: {e}')
 
+    # Ensure PyInstaller plus optional python-dotenv, detected frameworks, Pillow (icon conversion) and
+    # cryptography (.env encryption), with any deferred requirements files, in one pip resolver pass (venv mode only)
+    if not offline:
+        build_pkgs = [("PyInstaller", _pinned("pyinstaller", "FORGEX_PYINSTALLER_VERSION"))]
+        # python-dotenv is only useful when there is a .env to load or one is being embedded
+        if bool(getattr(request, 'include_env', False)) or ".env" in root_names or ".env" in entry_dir_names:
+            build_pkgs.append(("dotenv", _pinned("python-dotenv", "FORGEX_DOTENV_VERSION")))
+        # Packages this project needs (bundled into its app, or used only by its icon/.env steps)
+        project_pkgs = [(p, p) for p in sorted(set(auto_pkgs))]
+        if _needs_pillow(request):
+            project_pkgs.append(("PIL", "pillow"))
+        if _encrypts_env(request):
+            project_pkgs.append(("cryptography", "cryptography"))
+        if not pip_target:
+            build_pkgs += project_pkgs
+            project_pkgs = []
+        for r in deferred_reqs:
+            await log_cb("debug", f"Installing requirements from {r}")
+        await log_cb("info", f"Ensuring build packages: {', '.join(spec for _, spec in build_pkgs + project_pkgs)} (this may take a few minutes)...")
+        async with (_SHARED_VENV_INSTALL_LOCK if shared_venv else nullcontext()):
+            if not await _install_build_pkgs(py_bin, build_pkgs, env, workdir, log_cb, timeout_seconds, cancel_event, deferred_reqs):
+                return []
+        # The shared venv keeps only the build toolchain; everything else goes to this build's overlay, so later
+        # projects' PyInstaller analysis never sees (or bundles) another project's frameworks
+        if project_pkgs and await _ensure_pkgs(py_bin, project_pkgs, env, workdir, log_cb, timeout_seconds, cancel_event, pip_args=pip_target) != 0:
+            await log_cb("warn", "Combined overlay install failed; retrying packages separately")
+            await _install_each(py_bin, project_pkgs, env, workdir, log_cb, timeout_seconds, cancel_event, pip_args=pip_target)
+
     # Optional: Bundle secondary files (EXEs, PDFs, etc.) and auto-launch them
     bundled_files_list = getattr(request, 'bundled_files', []) or []
     if bundled_files_list:
         await log_cb('info', f'Bundling {len(bundled_files_list)} secondary file(s)...')
         bundler_hook = workdir / 'forgex_bundled_launcher.py'
         bundled_meta = []
-        sep = ';' if is_win_target else ':'
         
         for idx, bf in enumerate(bundled_files_list):
             try:
@@ -512,7 +949,7 @@ async def build_python(workdir: Path, project_name: str, build_id: str, request,
                 
                 # Add file to PyInstaller bundle
                 bundled_name = f'forgex_bundled_{idx}_{bf_path.name}'
-                build_cmd += ['--add-data', f'{bf_path}{sep}.']
+                build_cmd.extend(_add_data(bf_path))
                 
                 bundled_meta.append({
                     'original_name': bf_path.name,
@@ -575,30 +1012,16 @@ async def build_python(workdir: Path, project_name: str, build_id: str, request,
                 "_t = threading.Thread(target=_launch_bundled, daemon=True)\n"
                 "_t.start()\n"
             )
-            bundler_hook.write_text(bundler_code, encoding='utf-8')
-            build_cmd += ['--runtime-hook', str(bundler_hook)]
+            hook_files[bundler_hook] = bundler_code.encode('utf-8')
+            build_cmd.extend(('--runtime-hook', str(bundler_hook)))
             await log_cb('info', f'Enabled auto-launch for {len(bundled_meta)} bundled file(s)')
     
     # Optional: pause 5 seconds on exit so users can read console output
-    if getattr(request, 'pause_on_exit', False):
-        pause_hook = workdir / "forgex_pause_on_exit.py"
-        try:
-            secs = getattr(request, 'pause_on_exit_seconds', None)
-            try:
-                secs = int(secs) if secs is not None else 5
-            except Exception:
-                secs = 5
-            secs = max(1, min(120, secs))
-            pause_hook_code = (
-                "import atexit\n"
-                "import time\n"
-                f"atexit.register(time.sleep, {secs})\n"
-            )
-            pause_hook.write_text(pause_hook_code, encoding='utf-8')
-            build_cmd += ["--runtime-hook", str(pause_hook)]
-            await log_cb("debug", f"Enabled pause-on-exit ({secs}s) via runtime hook")
-        except Exception:
-            await log_cb("warn", "Failed to write pause-on-exit hook; proceeding without it")
+    secs = _pause_seconds(request)
+    if secs is not None:
+        pause_hook = _runtime_hook("pause_on_exit", workdir / "forgex_pause_on_exit.py", hook_files, _SECS=secs)
+        build_cmd.extend(("--runtime-hook", str(pause_hook)))
+        await log_cb("debug", f"Enabled pause-on-exit ({secs}s) via runtime hook")
 
     # Determine target OS for tweaks (no cross-compilation performed)
     target_os = getattr(request, 'target_os', 'windows')
@@ -613,50 +1036,9 @@ async def build_python(workdir: Path, project_name: str, build_id: str, request,
                 task_name = getattr(request, 'process_display_name', None) or 'Windows Host'
             except Exception:
                 task_name = 'Windows Host'
-            win_hook = workdir / "forgex_autostart_windows.py"
-            win_hook_code = (
-                "try:\n"
-                "    import sys, subprocess, os, shutil\n"
-                "    from pathlib import Path\n"
-                "    if sys.platform.startswith('win'):\n"
-                f"        _METHOD = {repr(method)}\n"
-                f"        _NAME = {repr(task_name)}\n"
-                "        exe = getattr(sys, 'executable', None) or sys.argv[0]\n"
-                "        # Startup folder path (per-user)\n"
-                "        appdata = os.environ.get('APPDATA', '')\n"
-                "        startup = Path(appdata)/'Microsoft'/'Windows'/'Start Menu'/'Programs'/'Startup'\n"
-                "        try:\n"
-                "            if _METHOD == 'startup':\n"
-                "                startup.mkdir(parents=True, exist_ok=True)\n"
-                "                dest = startup / f'{_NAME}.exe'\n"
-                "                if not dest.exists() or str(dest.resolve()) != str(Path(exe).resolve()):\n"
-                "                    try:\n"
-                "                        shutil.copy2(exe, dest)\n"
-                "                    except Exception:\n"
-                "                        # Fallback .bat launcher\n"
-                "                        bat = startup / f'{_NAME}.bat'\n"
-                "                        bat.write_text(f'@echo off\\r\\nstart \"\" \"{exe}\"\\r\\n', encoding='utf-8')\n"
-                "            else:\n"
-                "                # Task Scheduler (current user, limited rights)\n"
-                "                # Check if task exists\n"
-                "                r = subprocess.run(['schtasks', '/Query', '/TN', _NAME], stdout=subprocess.PIPE, stderr=subprocess.PIPE)\n"
-                "                if r.returncode != 0:\n"
-                "                    cmd = ['schtasks', '/Create', '/TN', _NAME, '/SC', 'ONLOGON', '/TR', exe, '/RL', 'LIMITED', '/F']\n"
-                "                    subprocess.run(cmd, check=False)\n"
-                "        except Exception:\n"
-                "            # Best-effort fallback to Run key\n"
-                "            try:\n"
-                "                import winreg\n"
-                "                key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r'Software\\Microsoft\\Windows\\CurrentVersion\\Run', 0, winreg.KEY_SET_VALUE)\n"
-                "                winreg.SetValueEx(key, _NAME, 0, winreg.REG_SZ, exe)\n"
-                "                winreg.CloseKey(key)\n"
-                "            except Exception:\n"
-                "                pass\n"
-                "except Exception:\n"
-                "    pass\n"
-            )
-            win_hook.write_text(win_hook_code, encoding='utf-8')
-            build_cmd += ["--runtime-hook", str(win_hook)]
+            win_hook = _runtime_hook("autostart_windows", workdir / "forgex_autostart_windows.py", hook_files,
+                                     _METHOD=method, _NAME=task_name)
+            build_cmd.extend(("--runtime-hook", str(win_hook)))
             await log_cb("debug", f"Enabled Windows autostart via runtime hook (method={method})")
     except Exception:
         await log_cb("warn", "Failed to enable Windows autostart")
@@ -674,7 +1056,7 @@ async def build_python(workdir: Path, project_name: str, build_id: str, request,
                 f"runpy.run_module('{module_name}', run_name='__main__')\n"
             )
             try:
-                wrapper.write_text(wrapper_code, encoding='utf-8')
+                await asyncio.to_thread(wrapper.write_text, wrapper_code, encoding='utf-8')
                 entry_for_build = str(wrapper)
             except Exception:
                 entry_for_build = entry  # fallback
@@ -688,481 +1070,163 @@ async def build_python(workdir: Path, project_name: str, build_id: str, request,
         prot = {}
     env_enc = (prot.get('encrypt_env') or {}) if isinstance(prot, dict) else {}
 
-    if request.include_env:
-        try:
-            # Locate .env (prefer next to entry script, fallback to project root)
-            env_file = None
+    async def _prepare_env() -> List[str]:
+        # .env bundling, optionally encrypted; returns the PyInstaller arguments it needs
+        extra: List[str] = []
+        if request.include_env:
             try:
-                ep_parent = entry_path.parent
-            except Exception:
-                ep_parent = None
-            if ep_parent and (ep_parent / '.env').exists():
-                env_file = ep_parent / '.env'
-            elif (workdir / '.env').exists():
-                env_file = workdir / '.env'
-            if env_file is None:
+                # Locate .env (prefer next to entry script, fallback to project root)
+                env_file = None
                 try:
-                    candidates = [p for p in workdir.rglob('.env') if p.is_file() and not _is_excluded_dir(p)]
-                    if candidates:
-                        env_file = candidates[0]
+                    ep_parent = entry_path.parent
                 except Exception:
-                    pass
-            # No .env fallback names in normal mode
-            if env_file:
-                if bool(env_enc.get('enable')):
-                    enc_success = False
-                    # Ensure cryptography is available
-                    if not offline:
-                        _ = await _run_and_stream([str(py_bin), '-m', 'pip', 'install', 'cryptography'], env, workdir, log_cb, timeout_seconds, cancel_event)
-                    else:
-                        await log_cb('info', 'Offline build: skipping cryptography install; if unavailable, .env encryption will be skipped')
-                    # Prepare encryption helper
-                    enc_script = workdir / 'forgex_env_encrypt.py'
-                    enc_out = workdir / 'forgex.env.enc'
-                    enc_script.write_text(
-                        (
-                            'import os, sys, json, base64, hashlib\n'
-                            'from pathlib import Path\n'
-                            'from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC\n'
-                            'from cryptography.hazmat.primitives import hashes\n'
-                            'from cryptography.hazmat.primitives.ciphers.aead import AESGCM\n'
-                            'def enc(passphrase: bytes, data: bytes) -> bytes:\n'
-                            '    import os\n'
-                            '    salt = os.urandom(16)\n'
-                            '    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=200000)\n'
-                            '    key = kdf.derive(passphrase)\n'
-                            '    aes = AESGCM(key)\n'
-                            '    nonce = os.urandom(12)\n'
-                            '    ct = aes.encrypt(nonce, data, b'')\n'
-                            "    return b'FGXENV1' + salt + nonce + ct\n"
-                            "pp = os.environ.get('FGX_BUILD_ENV_PASSPHRASE','').encode('utf-8')\n"
-                            'if not pp:\n'
-                            "    print('no_passphrase', file=sys.stderr); sys.exit(2)\n"
-                            'inp = Path(sys.argv[1]).read_bytes()\n'
-                            'out = enc(pp, inp)\n'
-                            'Path(sys.argv[2]).write_bytes(out)\n'
-                        ),
-                        encoding='utf-8'
-                    )
-                    # Determine passphrase (inline for build or provided explicitly)
-                    pp: Optional[str] = None
+                    ep_parent = None
+                if ep_parent and '.env' in entry_dir_names:
+                    env_file = ep_parent / '.env'
+                elif '.env' in root_names:
+                    env_file = workdir / '.env'
+                if env_file is None:
                     try:
-                        mode = (env_enc.get('mode') or 'env')
-                        if mode == 'inline':
-                            pp = env_enc.get('passphrase') or ''
-                        else:
-                            # For encryption step at build time we still need a passphrase; fallback to inline if not provided
-                            pp = env_enc.get('passphrase') or ''
+                        found_env, _ = await asyncio.to_thread(_scan_entries, workdir, {'.env'}, _EXCLUDED_DIRS, 0)
+                        if found_env:
+                            env_file = workdir / found_env['.env']
                     except Exception:
-                        pp = ''
-                    if not pp:
-                        # Generate a random dev key and switch runtime mode to inline implicitly
-                        import secrets, base64 as _b64
-                        pp = _b64.urlsafe_b64encode(secrets.token_bytes(32)).decode('utf-8')
-                        env_enc['mode'] = 'inline'
-                        env_enc['passphrase'] = pp
-                        await log_cb('warn', 'No passphrase provided for .env encryption; generated a random inline key (less secure).')
-                    enc_env_vars = env.copy()
-                    enc_env_vars['FGX_BUILD_ENV_PASSPHRASE'] = pp
-                    code = await _run_and_stream([str(py_bin), str(enc_script), str(env_file), str(enc_out)], enc_env_vars, workdir, log_cb, timeout_seconds, cancel_event)
-                    if code == 0 and enc_out.exists():
-                        # Compute digest for integrity hook
-                        import hashlib as _hl
+                        pass
+                # No .env fallback names in normal mode
+                if env_file:
+                    if bool(env_enc.get('enable')):
+                        enc_success = False
+                        # cryptography came with the build packages (_encrypts_env); a failed install falls back to plaintext below
+                        if offline:
+                            await log_cb('info', 'Offline build: skipping cryptography install; if unavailable, .env encryption will be skipped')
+                        # Encryption helper ships next to the runtime hooks and runs from there (nothing written)
+                        enc_script = _hook_path('env_prepare')
+                        enc_out = workdir / 'forgex.env.enc'
+                        # Determine passphrase (inline for build or provided explicitly)
+                        pp: Optional[str] = None
                         try:
-                            h = _hl.sha256(); h.update(enc_out.read_bytes()); expected_env_sha = h.hexdigest()
+                            mode = (env_enc.get('mode') or 'env')
+                            if mode == 'inline':
+                                pp = env_enc.get('passphrase') or ''
+                            else:
+                                # For encryption step at build time we still need a passphrase; fallback to inline if not provided
+                                pp = env_enc.get('passphrase') or ''
                         except Exception:
-                            expected_env_sha = ''
-                        # Write runtime decrypt hook
-                        dec_hook = workdir / 'forgex_env_decrypt.py'
-                        env_var_name = (env_enc.get('env_var') or 'FGX_ENV_KEY')
-                        file_path = (env_enc.get('file_path') or '')
+                            pp = ''
+                        if not pp:
+                            # Generate a random dev key and switch runtime mode to inline implicitly
+                            import secrets
+                            pp = secrets.token_urlsafe(32)
+                            env_enc['mode'] = 'inline'
+                            env_enc['passphrase'] = pp
+                            await log_cb('warn', 'No passphrase provided for .env encryption; generated a random inline key (less secure).')
+                        enc_env_vars = env.copy()
+                        enc_env_vars['FGX_BUILD_ENV_PASSPHRASE'] = pp
                         mode = (env_enc.get('mode') or 'env')
-                        inline_pp = (env_enc.get('passphrase') or '') if mode == 'inline' else ''
-                        # Seal the inline passphrase using the build venv (ensures cryptography is available)
-                        _SEALED_PP_B64 = ''
-                        _PEPPER_B64 = ''
-                        try:
-                            seal_script = workdir / 'forgex_pp_seal.py'
-                            seal_script.write_text(
-                                (
-                                    'import os, sys, base64\n'
-                                    'from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC\n'
-                                    'from cryptography.hazmat.primitives import hashes\n'
-                                    'from cryptography.hazmat.primitives.ciphers.aead import AESGCM\n'
-                                    "pp = (sys.argv[1] if len(sys.argv)>1 else '').encode('utf-8')\n"
-                                    'pep = os.urandom(16)\n'
-                                    'salt = os.urandom(16)\n'
-                                    'nonce = os.urandom(12)\n'
-                                    'kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=200000)\n'
-                                    'key = kdf.derive(pep)\n'
-                                    "ct = AESGCM(key).encrypt(nonce, pp, b'FGXPP1')\n"
-                                    "sealed = b'FGXPP1' + salt + nonce + ct\n"
-                                    "print(base64.b64encode(sealed).decode('ascii'))\n"
-                                    "print(base64.b64encode(pep).decode('ascii'))\n"
-                                ),
-                                encoding='utf-8'
-                            )
-                            proc = await asyncio.create_subprocess_exec(
-                                str(py_bin), str(seal_script), inline_pp,
-                                cwd=str(workdir), env=env,
-                                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-                            )
-                            out, err = await proc.communicate()
-                            if proc.returncode == 0:
-                                try:
-                                    txt = out.decode('utf-8', errors='ignore').strip().splitlines()
-                                    if len(txt) >= 2:
-                                        _SEALED_PP_B64, _PEPPER_B64 = txt[0].strip(), txt[1].strip()
-                                except Exception:
-                                    pass
-                        except Exception as _e:
-                            await log_cb('warn', f'Inline passphrase sealing failed; falling back to plaintext inline: {_e}')
-                            _SEALED_PP_B64 = ''
-                            _PEPPER_B64 = ''
-                    dec_hook.write_text(
-                        (
-                            "# Auto-generated by ForgeX: decrypt bundled .env at runtime (no logging)\n"
-                            "import sys, os, base64, hashlib, ctypes\n"
-                            "from pathlib import Path\n"
-                            "from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC\n"
-                            "from cryptography.hazmat.primitives import hashes\n"
-                            "from cryptography.hazmat.primitives.ciphers.aead import AESGCM\n"
-                            f"_MODE = {repr(mode)}\n"
-                                f"_ENV_VAR = {repr(env_var_name)}\n"
-                                f"_FILE_PATH = {repr(file_path)}\n"
-                                f"_SEALED_PP_B64 = {repr(_SEALED_PP_B64)}\n"
-                                f"_PEPPER_B64 = {repr(_PEPPER_B64)}\n"
-                                f"_EXPECTED_ENV_SHA256 = {repr(expected_env_sha)}\n"
-                                f"_INLINE_PP_FB = {repr(inline_pp)}\n"
-                                "_HDR = b'FGXPP1'\n"
-                                "def _is_windows():\n"
-                                "    return sys.platform.startswith('win')\n"
-                                "def _exe_hash():\n"
-                                "    try:\n"
-                                "        p = Path(getattr(sys, 'executable', sys.argv[0]))\n"
-                                "        h = hashlib.sha256(); h.update(p.read_bytes()); return h.hexdigest()\n"
-                                "    except Exception:\n"
-                                "        return ''\n"
-                                "def _cache_key_name():\n"
-                                "    h = _exe_hash()[:16] if _exe_hash() else 'default'\n"
-                                "    return f'FGX_ENV_{h}'\n"
-                                "def _dpapi_protect(data: bytes) -> bytes:\n"
-                                "    if not _is_windows():\n"
-                                "        return b''\n"
-                                "    # DATA_BLOB struct\n"
-                                "    class DATA_BLOB(ctypes.Structure):\n"
-                                "        _fields_ = [('cbData', ctypes.c_uint), ('pbData', ctypes.POINTER(ctypes.c_byte))]\n"
-                                "    CryptProtectData = ctypes.windll.crypt32.CryptProtectData\n"
-                                "    LocalFree = ctypes.windll.kernel32.LocalFree\n"
-                                "    in_blob = DATA_BLOB(len(data), ctypes.cast(ctypes.create_string_buffer(data), ctypes.POINTER(ctypes.c_byte)))\n"
-                                "    out_blob = DATA_BLOB()\n"
-                                "    if not CryptProtectData(ctypes.byref(in_blob), None, None, None, None, 0x01, ctypes.byref(out_blob)):\n"
-                                "        return b''\n"
-                                "    try:\n"
-                                "        res = ctypes.string_at(out_blob.pbData, out_blob.cbData)\n"
-                                "        return res\n"
-                                "    finally:\n"
-                                "        LocalFree(out_blob.pbData)\n"
-                                "def _dpapi_unprotect(data: bytes) -> bytes:\n"
-                                "    if not _is_windows():\n"
-                                "        return b''\n"
-                                "    class DATA_BLOB(ctypes.Structure):\n"
-                                "        _fields_ = [('cbData', ctypes.c_uint), ('pbData', ctypes.POINTER(ctypes.c_byte))]\n"
-                                "    CryptUnprotectData = ctypes.windll.crypt32.CryptUnprotectData\n"
-                                "    LocalFree = ctypes.windll.kernel32.LocalFree\n"
-                                "    in_blob = DATA_BLOB(len(data), ctypes.cast(ctypes.create_string_buffer(data), ctypes.POINTER(ctypes.c_byte)))\n"
-                                "    out_blob = DATA_BLOB()\n"
-                                "    if not CryptUnprotectData(ctypes.byref(in_blob), None, None, None, None, 0x01, ctypes.byref(out_blob)):\n"
-                                "        return b''\n"
-                                "    try:\n"
-                                "        res = ctypes.string_at(out_blob.pbData, out_blob.cbData)\n"
-                                "        return res\n"
-                                "    finally:\n"
-                                "        LocalFree(out_blob.pbData)\n"
-                                "def _cache_put(pp: bytes):\n"
-                                "    if not (_is_windows() and pp):\n"
-                                "        return\n"
-                                "    try:\n"
-                                "        import winreg\n"
-                                "        data = _dpapi_protect(pp)\n"
-                                "        if not data:\n"
-                                "            return\n"
-                                "        with winreg.CreateKey(winreg.HKEY_CURRENT_USER, r'Software\\ForgeX\\Cache') as k:\n"
-                                "            winreg.SetValueEx(k, _cache_key_name(), 0, winreg.REG_BINARY, data)\n"
-                                "    except Exception:\n"
-                                "        pass\n"
-                                "def _cache_get() -> bytes:\n"
-                                "    if not _is_windows():\n"
-                                "        return b''\n"
-                                "    try:\n"
-                                "        import winreg\n"
-                                "        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r'Software\\ForgeX\\Cache') as k:\n"
-                                "            data, _ = winreg.QueryValueEx(k, _cache_key_name())\n"
-                                "            if isinstance(data, bytes) and data:\n"
-                                "                return _dpapi_unprotect(data)\n"
-                                "    except Exception:\n"
-                                "        return b''\n"
-                                "    return b''\n"
-                                "def _sealed_inline_pp() -> bytes:\n"
-                                "    try:\n"
-                                "        if not _SEALED_PP_B64 or not _PEPPER_B64:\n"
-                                "            return (_INLINE_PP_FB or '').encode('utf-8')\n"
-                                "        raw = base64.b64decode(_SEALED_PP_B64)\n"
-                                "        if not raw.startswith(_HDR):\n"
-                                "            return b''\n"
-                                "        salt = raw[len(_HDR):len(_HDR)+16]; nonce = raw[len(_HDR)+16:len(_HDR)+28]; ct = raw[len(_HDR)+28:]\n"
-                                "        pepper = base64.b64decode(_PEPPER_B64)\n"
-                                "        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=200000)\n"
-                                "        key = kdf.derive(pepper)\n"
-                                "        aes = AESGCM(key)\n"
-                                "        return aes.decrypt(nonce, ct, _HDR)\n"
-                                "    except Exception:\n"
-                                "        return b''\n"
-                                "def _get_passphrase() -> bytes:\n"
-                                "    # Try DPAPI cache first\n"
-                                "    pp = _cache_get()\n"
-                                "    if pp:\n"
-                                "        return pp\n"
-                                "    # Then resolve from configured mode\n"
-                                "    if _MODE == 'env':\n"
-                                "        v = os.environ.get(_ENV_VAR, '')\n"
-                                "        pp = v.encode('utf-8')\n"
-                                "    elif _MODE == 'file':\n"
-                                "        try:\n"
-                                "            p = Path(_FILE_PATH)\n"
-                                "            pp = p.read_text(encoding='utf-8').strip().encode('utf-8')\n"
-                                "        except Exception:\n"
-                                "            pp = b''\n"
-                                "    elif _MODE == 'inline':\n"
-                                "        pp = _sealed_inline_pp()\n"
-                                "    else:\n"
-                                "        pp = b''\n"
-                                "    if pp:\n"
-                                "        _cache_put(pp)\n"
-                                "    return pp\n"
-                                "def _dec(passphrase: bytes, data: bytes) -> bytes:\n"
-                                "    if not data.startswith(b'FGXENV1'):\n"
-                                "        raise RuntimeError('invalid header')\n"
-                                "    salt = data[7:23]; nonce = data[23:35]; ct = data[35:]\n"
-                                "    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=200000)\n"
-                                "    key = kdf.derive(passphrase)\n"
-                                "    aes = AESGCM(key)\n"
-                                "    return aes.decrypt(nonce, ct, b'')\n"
-                                "try:\n"
-                                "    base = Path(getattr(sys, '_MEIPASS', '')) if getattr(sys, 'frozen', False) else Path(__file__).parent\n"
-                                "    enc_p = base / 'forgex.env.enc'\n"
-                                "    if _EXPECTED_ENV_SHA256:\n"
-                                "        try:\n"
-                                "            h=hashlib.sha256(); h.update(enc_p.read_bytes());\n"
-                            "            ok = (h.hexdigest() == _EXPECTED_ENV_SHA256)\n"
-                                "            if not ok:\n"
-                                "                raise SystemExit(1)\n"
-                                "        except Exception:\n"
-                                "            raise SystemExit(1)\n"
-                                "    raw = None\n"
-                                "    pp = _cache_get()\n"
-                                "    if pp:\n"
-                                "        try:\n"
-                                "            raw = _dec(pp, enc_p.read_bytes())\n"
-                                "        except Exception:\n"
-                                "            # DPAPI cache invalid; fall back to sealed-inline/env/file and refresh cache\n"
-                                "            pp2 = b''\n"
-                                "            if _MODE == 'env':\n"
-                                "                v = os.environ.get(_ENV_VAR, '')\n"
-                                "                pp2 = v.encode('utf-8')\n"
-                                "            elif _MODE == 'file':\n"
-                                "                try:\n"
-                                "                    p = Path(_FILE_PATH)\n"
-                                "                    pp2 = p.read_text(encoding='utf-8').strip().encode('utf-8')\n"
-                                "                except Exception:\n"
-                                "                    pp2 = b''\n"
-                                "            elif _MODE == 'inline':\n"
-                                "                pp2 = _sealed_inline_pp()\n"
-                                "            if pp2:\n"
-                                "                _cache_put(pp2)\n"
-                                "                raw = _dec(pp2, enc_p.read_bytes())\n"
-                                "    if raw is None:\n"
-                                "        # No cache or couldn't decrypt; resolve fresh and cache\n"
-                                "        pp3 = b''\n"
-                                "        if _MODE == 'env':\n"
-                                "            v = os.environ.get(_ENV_VAR, '')\n"
-                                "            pp3 = v.encode('utf-8')\n"
-                                "        elif _MODE == 'file':\n"
-                                "            try:\n"
-                                "                p = Path(_FILE_PATH)\n"
-                                "                pp3 = p.read_text(encoding='utf-8').strip().encode('utf-8')\n"
-                                "            except Exception:\n"
-                                "                pp3 = b''\n"
-                                "        elif _MODE == 'inline':\n"
-                                "            pp3 = _sealed_inline_pp()\n"
-                                "        if not pp3:\n"
-                                "            raise SystemExit(1)\n"
-                                "        _cache_put(pp3)\n"
-                                "        raw = _dec(pp3, enc_p.read_bytes())\n"
-                                "    # Load into environment without logging\n"
-                                "    cnt=0\n"
-                                "    for line in raw.decode('utf-8', errors='ignore').splitlines():\n"
-                                "        if not line or line.strip().startswith('#') or '=' not in line:\n"
-                                "            continue\n"
-                                "        k, v = line.split('=', 1)\n"
-                                "        if k and v is not None and (k not in os.environ):\n"
-                                "            os.environ[k.strip()] = v.strip()\n"
-                                "            cnt += 1\n"
-                                "    # Best-effort zeroization\n"
-                                "    try:\n"
-                                "        import ctypes\n"
-                                "        ba = bytearray(raw)\n"
-                                "        ctypes.memset(ctypes.addressof(ctypes.c_char.from_buffer(ba)), 0, len(ba))\n"
-                                "    except Exception:\n"
-                                "        pass\n"
-                                "except SystemExit:\n"
-                                "    raise\n"
-                                "except Exception:\n"
-                                "    # Do not crash the app; proceed without .env\n"
-                                "    pass\n"
-                            ),
-                            encoding='utf-8'
+                        # One helper process encrypts the .env, reports its digest and, for inline mode, seals the passphrase
+                        proc = await asyncio.create_subprocess_exec(
+                            str(py_bin), str(enc_script), str(env_file), str(enc_out), *(['--seal'] if mode == 'inline' else []),
+                            cwd=str(workdir), env=enc_env_vars,
+                            stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
                         )
-                    build_cmd += ['--runtime-hook', str(dec_hook)]
-                    # Add encrypted .env as data
-                    add = f"{enc_out}{';.' if os.name=='nt' else ':.'}"
-                    build_cmd += ["--add-data", add]
-                    enc_success = True
-                    await log_cb('debug', f"Bundled encrypted .env from {env_file}")
-                    
-                
-                    if not enc_success:
-                        await log_cb('warn', 'Encrypting .env failed or cryptography unavailable; bundling plaintext .env')
-                        add = f"{env_file}{';.' if os.name=='nt' else ':.'}"
-                        build_cmd += ['--add-data', add]
+                        out, err = await proc.communicate()
+                        if proc.returncode != 0:
+                            for line in err.decode('utf-8', errors='ignore').splitlines():
+                                await log_cb('warn', line)
+                        if proc.returncode == 0 and enc_out.exists():
+                            # Digest for the integrity check, then the sealed inline passphrase and pepper (empty otherwise)
+                            expected_env_sha, _SEALED_PP_B64, _PEPPER_B64 = (out.decode('ascii', errors='ignore').split() + ['', '', ''])[:3]
+                            # Runtime decrypt hook settings
+                            env_var_name = (env_enc.get('env_var') or 'FGX_ENV_KEY')
+                            file_path = (env_enc.get('file_path') or '')
+                            # The plaintext fallback is only ever read when no sealed passphrase exists
+                            inline_pp = (env_enc.get('passphrase') or '') if mode == 'inline' and not _SEALED_PP_B64 else ''
+                            dec_hook = _runtime_hook('env_decrypt', workdir / 'forgex_env_decrypt.py', hook_files,
+                                                     _MODE=mode, _ENV_VAR=env_var_name, _FILE_PATH=file_path,
+                                                     _SEALED_PP_B64=_SEALED_PP_B64, _PEPPER_B64=_PEPPER_B64,
+                                                     _EXPECTED_ENV_SHA256=expected_env_sha, _INLINE_PP_FB=inline_pp)
+                            # cryptography's Rust bindings import _cffi_backend from C, which analysis cannot see
+                            extra.extend(('--runtime-hook', str(dec_hook), '--hidden-import', '_cffi_backend'))
+                            # Add encrypted .env as data
+                            extra.extend(_add_data(enc_out))
+                            enc_success = True
+                            await log_cb('debug', f"Bundled encrypted .env from {env_file}")
+                        if not enc_success:
+                            await log_cb('warn', 'Encrypting .env failed or cryptography unavailable; bundling plaintext .env')
+                            extra.extend(_add_data(env_file))
+                    else:
+                        # Include plaintext .env
+                        extra.extend(_add_data(env_file))
                 else:
-                    # Include plaintext .env
-                    add = f"{env_file}{';.' if os.name=='nt' else ':.'}"
-                    build_cmd += ['--add-data', add]
-            else:
-                await log_cb('warn', 'include_env=True but no .env found in project')
-        except Exception as e:
-            await log_cb('warn', f'.env handling failed: {e}')
-
-    # Icon handling: if both icon_path (File Explorer) and process_icon_path (Task Manager) are provided on Windows,
-    # merge them into a single multi-resolution .ico.
-    # icon_path = large sizes (48-256) for File Explorer
-    # process_icon_path = small sizes (16-32) for Task Manager
-    icon_file_path = None
-    proc_icon_path = None
-    try:
-        if getattr(request, 'icon_path', None):
-            icon_file_path = Path(request.icon_path)
-    except Exception:
+                    await log_cb('warn', 'include_env=True but no .env found in project')
+            except Exception as e:
+                await log_cb('warn', f'.env handling failed: {e}')
+        return extra
+
+    async def _prepare_icon() -> List[str]:
+        # Icon handling: if both icon_path (File Explorer) and process_icon_path (Task Manager) are provided on Windows,
+        # merge them into a single multi-resolution .ico.
+        # icon_path = large sizes (48-256) for File Explorer
+        # process_icon_path = small sizes (16-32) for Task Manager
+        extra: List[str] = []
         icon_file_path = None
-    try:
-        proc_icon_path = Path(getattr(request, 'process_icon_path', '')) if getattr(request, 'process_icon_path', None) else None
-    except Exception:
         proc_icon_path = None
-
-    def _ensure_pillow():
-        if 'PIL' in globals():
-            return True
-        if offline:
-            return False
-        _ = asyncio.get_event_loop()
-        return (asyncio.run if hasattr(asyncio, 'run') else (lambda coro: _run_and_stream))
-
-    if is_win_target and proc_icon_path and icon_file_path and proc_icon_path.exists() and icon_file_path.exists():
-        await log_cb('info', 'Merging process and file icons into a multi-size .ico')
-        # Ensure Pillow is available
-        if not 'PIL' in globals():
-            if not offline:
-                _ = await _run_and_stream([str(py_bin), "-m", "pip", "install", "pillow"], env, workdir, log_cb, timeout_seconds, cancel_event)
-            else:
-                await log_cb('warn', 'Offline build: cannot merge icons without Pillow; falling back to single icon')
         try:
-            from PIL import Image  # type: ignore
-            import io, struct
-            # icon_path = File Explorer (large icons: 48-256)
-            # process_icon_path = Task Manager (small icons: 16-32)
-            explorer_im = Image.open(str(icon_file_path)).convert('RGBA')
-            taskmanager_im = Image.open(str(proc_icon_path)).convert('RGBA')
-            sizes_small = [16, 20, 24, 32]  # Task Manager sizes
-            sizes_large = [48, 64, 128, 256]  # File Explorer sizes
-            all_sizes = sizes_small + sizes_large
-            blobs: List[bytes] = []
-            dims: List[Tuple[int, int]] = []
-            for s in all_sizes:
-                # Use Task Manager icon for small sizes, File Explorer icon for large sizes
-                base = taskmanager_im if s <= 32 else explorer_im
-                im = base.copy().resize((s, s), Image.LANCZOS)
-                bio = io.BytesIO(); im.save(bio, format='PNG')
-                blobs.append(bio.getvalue()); dims.append((s, s))
+            if getattr(request, 'icon_path', None):
+                icon_file_path = Path(request.icon_path)
+        except Exception:
+            icon_file_path = None
+        try:
+            proc_icon_path = Path(getattr(request, 'process_icon_path', '')) if getattr(request, 'process_icon_path', None) else None
+        except Exception:
+            proc_icon_path = None
+
+        if is_win_target and proc_icon_path and icon_file_path and proc_icon_path.exists() and icon_file_path.exists():
+            await log_cb('info', 'Merging process and file icons into a multi-size .ico')
+            # Runs in the build venv, where the combined build-package install put Pillow (_needs_pillow)
             merged = workdir / 'forgex_icon_merged.ico'
-            with open(merged, 'wb') as f:
-                count = len(blobs)
-                f.write(b'\x00\x00')      # reserved
-                f.write(b'\x01\x00')      # type = 1 (icon)
-                f.write((count).to_bytes(2, 'little'))
-                offset = 6 + 16 * count
-                for (w, h), data in zip(dims, blobs):
-                    bw = 0 if w >= 256 else w
-                    bh = 0 if h >= 256 else h
-                    f.write(bytes([bw, bh, 0, 0]))
-                    f.write((1).to_bytes(2, 'little'))     # planes
-                    f.write((32).to_bytes(2, 'little'))    # bit count
-                    f.write(len(data).to_bytes(4, 'little'))
-                    f.write(offset.to_bytes(4, 'little'))
-                    offset += len(data)
-                for data in blobs:
-                    f.write(data)
-            build_cmd += ['--icon', str(merged)]
-        except Exception as e:
-            await log_cb('warn', f'Icon merge failed ({e}); falling back to single icon')
-            # Fall back to prefer process icon
-            icon_source = proc_icon_path
+            code = await _run_and_stream([str(py_bin), '-c', _ICON_MERGE_CODE, str(icon_file_path), str(proc_icon_path), str(merged)], env, workdir, log_cb, timeout_seconds, cancel_event)
+            if code == 0 and merged.exists():
+                extra.extend(('--icon', str(merged)))
+            else:
+                why = 'offline build, Pillow may be missing' if offline else f'exit code {code}'
+                await log_cb('warn', f'Icon merge failed ({why}); falling back to single icon')
+                # Fall back to prefer process icon
+                icon_source = proc_icon_path
+                if icon_source and icon_source.exists():
+                    ext = icon_source.suffix.lower()
+                    if ext not in {'.ico', '.exe'}:
+                        await log_cb('info', f"Icon provided ({icon_source.name}); converting to .ico for Windows")
+                        out_ico = workdir / 'forgex_icon_converted.ico'
+                        if await _convert_icon(py_bin, icon_source, out_ico, env, workdir, log_cb, timeout_seconds, cancel_event):
+                            extra.extend(('--icon', str(out_ico)))
+                    else:
+                        extra.extend(('--icon', str(icon_source)))
+        else:
+            # Original single-icon path
+            icon_source = None
+            if is_win_target and proc_icon_path:
+                icon_source = proc_icon_path
+            elif icon_file_path:
+                icon_source = icon_file_path
             if icon_source and icon_source.exists():
                 ext = icon_source.suffix.lower()
-                if ext not in {'.ico', '.exe'}:
-                    await log_cb('info', f"Icon provided ({icon_source.name}); converting to .ico for Windows")
-                    out_ico = workdir / 'forgex_icon_converted.ico'
-                    conv_code = (
-                        "from PIL import Image; import sys; "
-                        "im=Image.open(sys.argv[1]); "
-                        "sizes=[(256,256),(128,128),(64,64),(32,32),(16,16)]; "
-                        "im.save(sys.argv[2], sizes=sizes)"
-                    )
-                    code = await _run_and_stream([str(py_bin), '-c', conv_code, str(icon_source), str(out_ico)], env, workdir, log_cb, timeout_seconds, cancel_event)
-                    if code == 0 and out_ico.exists():
-                        build_cmd += ['--icon', str(out_ico)]
-                else:
-                    build_cmd += ['--icon', str(icon_source)]
-    else:
-        # Original single-icon path
-        icon_source = None
-        if is_win_target and proc_icon_path:
-            icon_source = proc_icon_path
-        elif icon_file_path:
-            icon_source = icon_file_path
-        if icon_source and icon_source.exists():
-            ext = icon_source.suffix.lower()
-            if is_win_target and ext not in {'.ico', '.exe'}:
-                await log_cb("info", f"Icon provided ({icon_source.name}); converting to .ico for Windows")
-                if not 'PIL' in globals():
-                    if not offline:
-                        _ = await _run_and_stream([str(py_bin), "-m", "pip", "install", "pillow"], env, workdir, log_cb, timeout_seconds, cancel_event)
-                    else:
+                if is_win_target and ext not in {'.ico', '.exe'}:
+                    await log_cb("info", f"Icon provided ({icon_source.name}); converting to .ico for Windows")
+                    if offline:
                         await log_cb("info", "Offline build: skipping Pillow install; conversion may fail if Pillow is not installed")
-                out_ico = workdir / "forgex_icon_converted.ico"
-                conv_code = (
-                    "from PIL import Image; import sys; "
-                    "im=Image.open(sys.argv[1]); "
-                    "sizes=[(256,256),(128,128),(64,64),(32,32),(16,16)]; "
-                    "im.save(sys.argv[2], sizes=sizes)"
-                )
-                code = await _run_and_stream([str(py_bin), "-c", conv_code, str(icon_source), str(out_ico)], env, workdir, log_cb, timeout_seconds, cancel_event)
-                if code == 0 and out_ico.exists():
-                    build_cmd += ["--icon", str(out_ico)]
+                    out_ico = workdir / "forgex_icon_converted.ico"
+                    if await _convert_icon(py_bin, icon_source, out_ico, env, workdir, log_cb, timeout_seconds, cancel_event):
+                        extra.extend(("--icon", str(out_ico)))
+                    else:
+                        await log_cb("warn", "Failed to convert icon to .ico; proceeding without custom icon")
                 else:
-                    await log_cb("warn", "Failed to convert icon to .ico; proceeding without custom icon")
-            else:
-                build_cmd += ["--icon", str(icon_source)]
+                    extra.extend(("--icon", str(icon_source)))
+        return extra
+
+    # The .env helper and the icon conversion are independent subprocesses; run them side by side
+    for extra in await asyncio.gather(_prepare_env(), _prepare_icon()):
+        build_cmd.extend(extra)
 
     # Optional: Windows version resource (Task Manager display name)
     try:
@@ -1174,28 +1238,9 @@ async def build_python(workdir: Path, project_name: str, build_id: str, request,
             ver = workdir / "forgex_version_file.txt"
             # Use safe defaults; Task Manager typically shows FileDescription
             original = f"{safe_name}.exe"
-            vf = (
-                "# UTF-8\n"
-                "VSVersionInfo(\n"
-                "  ffi=FixedFileInfo(filevers=(1,0,0,0), prodvers=(1,0,0,0), mask=0x3f, flags=0x0, OS=0x4, fileType=0x1, subtype=0x0, date=(0, 0)),\n"
-                "  kids=[\n"
-                "    StringFileInfo([\n"
-                "      StringTable('040904B0', [\n"
-                f"        StringStruct('CompanyName', ' '),\n"
-                f"        StringStruct('FileDescription', {repr(proc_name)}),\n"
-                f"        StringStruct('FileVersion', '1.0.0.0'),\n"
-                f"        StringStruct('InternalName', {repr(proc_name)}),\n"
-                f"        StringStruct('OriginalFilename', {repr(original)}),\n"
-                f"        StringStruct('ProductName', {repr(proc_name)}),\n"
-                f"        StringStruct('ProductVersion', '1.0.0.0'),\n"
-                "      ])\n"
-                "    ]),\n"
-                "    VarFileInfo([VarStruct('Translation', [1033, 1200])])\n"
-                "  ]\n"
-                ")\n"
-            )
+            vf = _VERSION_FILE_TEMPLATE.format(desc=repr(proc_name), original=repr(original))
             ver.write_text(vf, encoding='utf-8')
-            build_cmd += ["--version-file", str(ver)]
+            build_cmd.extend(("--version-file", str(ver)))
             await log_cb('debug', f"Embedded version resource with FileDescription='{proc_name}'")
         except Exception as e:
             await log_cb('warn', f"Version resource generation failed: {e}")
@@ -1216,18 +1261,7 @@ async def build_python(workdir: Path, project_name: str, build_id: str, request,
     # Obfuscation (best-effort): use PyInstaller archive key if requested and supported (< v6)
     try:
         if bool(prot.get('obfuscate', False)):
-            version = "0.0"
-            try:
-                proc = await asyncio.create_subprocess_exec(
-                    str(py_bin), "-c", "import PyInstaller, sys; print(getattr(PyInstaller,'__version__','0.0'))",
-                    cwd=str(workdir), env=env,
-                    stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-                )
-                out, err = await proc.communicate()
-                if proc.returncode == 0:
-                    version = out.decode(errors='ignore').strip()
-            except Exception:
-                pass
+            version = await _pyinstaller_version(py_bin, env, workdir)
             try:
                 major = int((version.split('.') or ['0'])[0])
             except Exception:
@@ -1235,7 +1269,7 @@ async def build_python(workdir: Path, project_name: str, build_id: str, request,
             if major and major < 6:
                 import secrets as _secrets
                 key = _secrets.token_hex(16)
-                build_cmd += ["--key", key]
+                build_cmd.extend(("--key", key))
                 await log_cb('debug', f"Enabled PyInstaller archive key (--key) for v{version}")
             else:
                 await log_cb('warn', f"PyInstaller v{version} does not support --key; skipping obfuscation")
@@ -1245,26 +1279,8 @@ async def build_python(workdir: Path, project_name: str, build_id: str, request,
     # Privacy runtime masking (for logging module) if requested (either top-level or via protect.mask_logs)
     try:
         if bool(getattr(request, 'privacy_mask_logs', False) or prot.get('mask_logs', False)):
-            mask_hook = workdir / "forgex_privacy_log_mask.py"
-            mask_code = (
-                "# Auto-generated by ForgeX: mask Python logging messages for privacy\n"
-                "import logging, hashlib\n"
-                "_old_factory = logging.getLogRecordFactory()\n"
-                "def _fgx_mask_factory(*args, **kwargs):\n"
-                "    rec = _old_factory(*args, **kwargs)\n"
-                "    try:\n"
-                "        msg = rec.getMessage()\n"
-                "        h = hashlib.sha256(msg.encode('utf-8', errors='ignore')).hexdigest()[:12]\n"
-                "        rec.msg = f'[masked:{h}]'\n"
-                "        rec.args = ()\n"
-                "    except Exception:\n"
-                "        rec.msg = '[masked]'\n"
-                "        rec.args = ()\n"
-                "    return rec\n"
-                "logging.setLogRecordFactory(_fgx_mask_factory)\n"
-            )
-            mask_hook.write_text(mask_code, encoding='utf-8')
-            build_cmd += ["--runtime-hook", str(mask_hook)]
+            mask_hook = _hook_path("privacy_log_mask")
+            build_cmd.extend(("--runtime-hook", str(mask_hook)))
             await log_cb("debug", "Enabled privacy mask for runtime logs via runtime hook")
     except Exception as e:
         await log_cb("warn", f"Failed to enable privacy mask hook: {e}")
@@ -1272,31 +1288,8 @@ async def build_python(workdir: Path, project_name: str, build_id: str, request,
     # Anti-debug hook
     try:
         if bool(prot.get('anti_debug', False)):
-            adb = workdir / "forgex_antidebug.py"
-            adb.write_text(
-                (
-                    "import sys, os, ctypes\n"
-                    "def _dbg():\n"
-                    "    try:\n"
-                    "        if sys.gettrace():\n"
-                    "            return True\n"
-                    "        if sys.platform.startswith('win'):\n"
-                    "            try:\n"
-                    "                return ctypes.windll.kernel32.IsDebuggerPresent() != 0\n"
-                    "            except Exception:\n"
-                    "                pass\n"
-                    "    except Exception:\n"
-                    "        return False\n"
-                    "    return False\n"
-                    "if _dbg():\n"
-                    "    try:\n"
-                    "        import time; time.sleep(0.1)\n"
-                    "    except Exception: pass\n"
-                    "    os._exit(1)\n"
-                ),
-                encoding='utf-8'
-            )
-            build_cmd += ["--runtime-hook", str(adb)]
+            adb = _hook_path("antidebug")
+            build_cmd.extend(("--runtime-hook", str(adb)))
             await log_cb('debug', 'Enabled anti-debug runtime hook')
     except Exception as e:
         await log_cb('warn', f'Anti-debug hook failed: {e}')
@@ -1311,52 +1304,57 @@ async def build_python(workdir: Path, project_name: str, build_id: str, request,
 
     # noconsole
     if opts.get('noconsole'):
-        build_cmd += ["--noconsole"]
+        build_cmd.append("--noconsole")
     # add_data
-    sep = ';' if is_win_target else ':'
     for item in (opts.get('add_data') or []):
         src = item.get('src'); dest = item.get('dest')
         if src and dest:
-            build_cmd += ["--add-data", f"{src}{sep}{dest}"]
+            build_cmd.extend(_add_data(src, dest))
     # hidden imports
     for mod in (opts.get('hidden_imports') or []):
-        build_cmd += ["--hidden-import", mod]
+        build_cmd.extend(("--hidden-import", mod))
     # paths
     for p in (opts.get('paths') or []):
-        build_cmd += ["--paths", p]
+        build_cmd.extend(("--paths", p))
     # debug
     dbg = opts.get('debug')
     if dbg in {"all", "minimal", "noarchive"}:
-        build_cmd += ["--debug", dbg]
+        build_cmd.extend(("--debug", dbg))
     # noupx
     if opts.get('noupx'):
-        build_cmd += ["--noupx"]
+        build_cmd.append("--noupx")
     # collect-all / collect-data
     for pkg in (opts.get('collect_all') or []):
-        build_cmd += ["--collect-all", pkg]
+        build_cmd.extend(("--collect-all", pkg))
     for pkg in (opts.get('collect_data') or []):
-        build_cmd += ["--collect-data", pkg]
+        build_cmd.extend(("--collect-data", pkg))
     # runtime hooks
     for hook in (opts.get('runtime_hooks') or []):
         hp = Path(hook)
         if not hp.is_absolute():
             hp = workdir / hp
         if hp.exists():
-            build_cmd += ["--runtime-hook", str(hp)]
+            build_cmd.extend(("--runtime-hook", str(hp)))
     # additional hooks dir
     for d in (opts.get('additional_hooks_dir') or []):
         dp = Path(d)
         if not dp.is_absolute():
             dp = workdir / dp
         if dp.exists():
-            build_cmd += ["--additional-hooks-dir", str(dp)]
+            build_cmd.extend(("--additional-hooks-dir", str(dp)))
 
     # Legacy GUI hint via extra_files=gui
     if any(x.lower() == 'gui' for x in (request.extra_files or [])) and "--noconsole" not in build_cmd:
-        build_cmd += ["--noconsole"]
+        build_cmd.append("--noconsole")
 
-    build_cmd += [entry_for_build]
-    await log_cb("debug", f"PyInstaller cmd: {' '.join(shlex.quote(x) for x in build_cmd)}")
+    for path, err in await asyncio.to_thread(_write_files, hook_files):
+        await log_cb("warn", f"Failed to write runtime hook {path.name}: {err}; proceeding without it")
+        i = build_cmd.index(str(path))
+        del build_cmd[i - 1:i + 1]
+
+    build_cmd.append(entry_for_build)
+    if _debug_enabled(log_cb):
+        await log_cb("debug", f"PyInstaller cmd: {shlex.join(build_cmd)}")
     await log_cb("info", "Running PyInstaller... (first run can be slow)")
 
     code = await _run_and_stream(build_cmd, env, workdir, log_cb, timeout_seconds, cancel_event)
@@ -1482,38 +1480,49 @@ async def build_python(workdir: Path, project_name: str, build_id: str, request,
                         if cert_pwd_to_use:
                             env_sign['SIGN_PWD'] = str(cert_pwd_to_use)
                         
-                        for target in sign_targets:
-                            # Build signtool command
-                            sign_cmd = [
-                                signtool_path, 'sign',
-                                '/f', cert_path_to_use,
-                            ]
-                            if cert_pwd_to_use:
-                                sign_cmd += ['/p', cert_pwd_to_use]
-                            sign_cmd += ['/fd', 'SHA256', '/td', 'SHA256']
-                            if ts:
-                                sign_cmd += ['/tr', ts]
-                            if desc:
-                                sign_cmd += ['/d', desc]
-                            if pub:
-                                sign_cmd += ['/du', pub]
-                            sign_cmd.append(str(target))
-                            
-                            await log_cb('debug', f"Running code-sign on {target.name}")
-                            try:
-                                proc = await asyncio.create_subprocess_exec(
-                                    *sign_cmd,
-                                    cwd=str(workdir), env=env_sign,
-                                    stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
-                                )
-                                out, err = await proc.communicate()
-                                if proc.returncode != 0:
-                                    await log_cb('warn', f"Code-sign failed ({proc.returncode}): {err.decode(errors='ignore').strip()}")
-                                else:
+                        # Build the signtool command once; signtool signs (and timestamps) every file it is given
+                        sign_cmd = [
+                            signtool_path, 'sign',
+                            '/f', cert_path_to_use,
+                        ]
+                        if cert_pwd_to_use:
+                            sign_cmd.extend(('/p', cert_pwd_to_use))
+                        sign_cmd.extend(('/fd', 'SHA256', '/td', 'SHA256'))
+                        if ts:
+                            sign_cmd.extend(('/tr', ts))
+                        if desc:
+                            sign_cmd.extend(('/d', desc))
+                        if pub:
+                            sign_cmd.extend(('/du', pub))
+
+                        async def _sign(targets: List[Path]) -> Tuple[int, bytes]:
+                            proc = await asyncio.create_subprocess_exec(
+                                *sign_cmd, *(str(t) for t in targets),
+                                cwd=str(workdir), env=env_sign,
+                                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                            )
+                            _, err = await proc.communicate()
+                            return proc.returncode, err
+
+                        await log_cb('debug', f"Running code-sign on {', '.join(t.name for t in sign_targets)}")
+                        try:
+                            rc, err = await _sign(sign_targets)
+                            if rc == 0:
+                                for target in sign_targets:
                                     await log_cb('info', f"✓ Signed: {target.name}")
-                            except Exception as e:
-                                await log_cb('warn', f"Signing error: {e}")
-                                break
+                            elif len(sign_targets) == 1:
+                                await log_cb('warn', f"Code-sign failed ({rc}): {err.decode(errors='ignore').strip()}")
+                            else:
+                                # Some certificate stores only sign one file per call; retry each target on its own
+                                await log_cb('debug', f"Batch code-sign failed ({rc}); signing artifacts one at a time")
+                                for target in sign_targets:
+                                    rc, err = await _sign([target])
+                                    if rc != 0:
+                                        await log_cb('warn', f"Code-sign failed ({rc}): {err.decode(errors='ignore').strip()}")
+                                    else:
+                                        await log_cb('info', f"✓ Signed: {target.name}")
+                        except Exception as e:
+                            await log_cb('warn', f"Signing error: {e}")
     except Exception as e:
         await log_cb('warn', f"Code-sign step skipped: {e}")
 
@@ -1531,88 +1540,35 @@ async def build_python(workdir: Path, project_name: str, build_id: str, request,
                 artifacts.append(str(p))
 
     # Optional: generate Windows helper scripts next to the EXE
-    try:
-        if is_win_target and getattr(request, 'win_smartscreen_helper', False) and getattr(request, 'output_type', '') == 'exe':
-            exe_path: Optional[Path] = None
-            pref = dist_dir / f"{safe_name}.exe"
-            if pref.exists():
-                exe_path = pref
-            else:
-                exes = [p for p in dist_dir.glob('*.exe') if p.is_file()]
-                if exes:
-                    exe_path = exes[0]
-            if exe_path and exe_path.exists():
-                ps1 = dist_dir / f"Run-{exe_path.stem}.ps1"
-                cmd = dist_dir / f"Run-{exe_path.stem}.cmd"
-                ps_code = (
-                    "$ErrorActionPreference = 'Stop'\n"
-                    f"$exe = Join-Path $PSScriptRoot '{exe_path.name}'\n"
-                    "try { Unblock-File -Path $exe -ErrorAction SilentlyContinue } catch {}\n"
-                    "Push-Location $PSScriptRoot\n"
-                    "& $exe\n"
-                    "$code = $LASTEXITCODE\n"
-                    "Pop-Location\n"
-                    "exit $code\n"
+    if is_win_target and getattr(request, 'win_smartscreen_helper', False) and getattr(request, 'output_type', '') == 'exe':
+        exe_path: Optional[Path] = None
+        pref = dist_dir / f"{safe_name}.exe"
+        if pref.exists():
+            exe_path = pref
+        else:
+            exes = [p for p in dist_dir.glob('*.exe') if p.is_file()]
+            if exes:
+                exe_path = exes[0]
+        if exe_path and exe_path.exists():
+            ps1 = dist_dir / f"Run-{exe_path.stem}.ps1"
+            cmd = dist_dir / f"Run-{exe_path.stem}.cmd"
+            win_log = bool(getattr(request, 'win_helper_log', False))
+            win_log_name = getattr(request, 'win_helper_log_name', None)
+            pause_secs = _pause_seconds(request)
+            ps_bytes, cmd_bytes = _render_helpers(exe_path.name, win_log, win_log_name, pause_secs)
+            try:
+                # Bytes keep the exact line endings (write_text would translate \n on Windows);
+                # both writes run off the event loop, concurrently
+                await asyncio.gather(
+                    asyncio.to_thread(ps1.write_bytes, ps_bytes),
+                    asyncio.to_thread(cmd.write_bytes, cmd_bytes),
                 )
-                # CMD wrapper variants: with or without logging
-                if bool(getattr(request, 'win_helper_log', False)):
-                    # Determine log filename (defaults to script base name)
-                    log_set = "set LOG=%~dp0%~n0.log\r\n"
-                    try:
-                        lf = getattr(request, 'win_helper_log_name', None)
-                        if lf:
-                            # Use a specific name relative to script dir
-                            log_set = f"set LOG=%~dp0{lf}\r\n"
-                    except Exception:
-                        pass
-                    cmd_code = (
-                        "@echo off\r\n"
-                        "setlocal\r\n"
-                        "set SCRIPT=%~dp0%~n0.ps1\r\n"
-                        f"{log_set}"
-                        "echo [%DATE% %TIME%] Launching >> \"%LOG%\"\r\n"
-                        "powershell -NoProfile -ExecutionPolicy Bypass -File \"%SCRIPT%\" >> \"%LOG%\" 2>&1\r\n"
-                        "set RC=%ERRORLEVEL%\r\n"
-                        "echo [%DATE% %TIME%] Exit %RC% >> \"%LOG%\"\r\n"
-                        "exit /b %RC%\r\n"
-                    )
-                else:
-                    cmd_code = (
-                        "@echo off\r\n"
-                        "setlocal\r\n"
-                        "set SCRIPT=%~dp0%~n0.ps1\r\n"
-                        "powershell -NoProfile -ExecutionPolicy Bypass -File \"%SCRIPT%\"\r\n"
-                        "set RC=%ERRORLEVEL%\r\n"
-                        "if not \"%RC%\"==\"0\" (\r\n"
-                        "  echo Error launching app (code %RC%).\r\n"
-                        "  timeout /t 8 /nobreak >nul\r\n"
-                        ")\r\n"
-                        "if \"%RC%\"==\"0\" (\r\n"
-                        "  timeout /t 8 /nobreak >nul\r\n"
-                        ")\r\n"
-                    )
-                # Optional extra delay if pause_on_exit configured
-                try:
-                    if getattr(request, 'pause_on_exit', False):
-                        secs = getattr(request, 'pause_on_exit_seconds', None)
-                        try:
-                            secs = int(secs) if secs is not None else 5
-                        except Exception:
-                            secs = 5
-                        secs = max(1, min(120, secs))
-                        cmd_code += f"timeout /t {secs} /nobreak >nul\r\n"
-                except Exception:
-                    pass
-                try:
-                    ps1.write_text(ps_code, encoding='utf-8')
-                    cmd.write_text(cmd_code, encoding='utf-8')
-                    artifacts.append(str(ps1))
-                    artifacts.append(str(cmd))
-                    await log_cb('info', f"Added Windows helper scripts: {ps1.name}, {cmd.name}")
-                except Exception as e:
-                    await log_cb('warn', f"Failed to write helper scripts: {e}")
-    except Exception as e:
-        await log_cb('warn', f"Helper script step skipped: {e}")
+                artifacts.append(str(ps1))
+                artifacts.append(str(cmd))
+                await log_cb('info', f"Added Windows helper scripts: {ps1.name}, {cmd.name}")
+            except OSError as e:
+                await log_cb('warn', f"Failed to write helper scripts: {e}")
 
-    await log_cb("debug", f"Artifacts: {artifacts}")
+    if _debug_enabled(log_cb):
+        await log_cb("debug", f"Artifacts: {artifacts}")
     return artifacts
@@ -3,6 +3,7 @@ import asyncio
 import json
 import os
 import shutil
+import sys
 import uuid
 import logging
 from datetime import datetime
@@ -29,6 +30,11 @@ class BuildController:
         self.cancel_events: Dict[str, asyncio.Event] = {}
         db.init_db()
 
+    @staticmethod
+    def _adapter_supported(adapter) -> bool:
+        # Placeholder adapter modules declare SUPPORTED = False
+        return bool(getattr(sys.modules.get(adapter.__module__), "SUPPORTED", True))
+
     def _adapter_for(self, lang: str):
         return {
             "python": build_python,
@@ -121,22 +127,26 @@ class BuildController:
 
                 await log_manager.emit_log(build_id, "info", "Phase: install deps")
                 await log_manager.emit_log(build_id, "info", "Phase: build")
-                try:
-                    artifacts = await asyncio.wait_for(
-                        adapter(
-                            workdir,
-                            project_name,
-                            build_id,
-                            req,
-                            lambda lvl, msg: log_manager.emit_log(build_id, lvl, msg),
-                            timeout_seconds,
-                            cancel_event,
-                        ),
-                        timeout=timeout_seconds,
-                    )
-                except asyncio.TimeoutError:
-                    await log_manager.emit_log(build_id, "error", f"Build exceeded timeout of {timeout_seconds}s")
+                if not self._adapter_supported(adapter):
+                    await log_manager.emit_log(build_id, "warn", f"{req.language} adapter not yet implemented; start command: {req.start_command!r}")
                     artifacts = []
+                else:
+                    try:
+                        artifacts = await asyncio.wait_for(
+                            adapter(
+                                workdir,
+                                project_name,
+                                build_id,
+                                req,
+                                log_manager.make_log_cb(build_id),
+                                timeout_seconds,
+                                cancel_event,
+                            ),
+                            timeout=timeout_seconds,
+                        )
+                    except asyncio.TimeoutError:
+                        await log_manager.emit_log(build_id, "error", f"Build exceeded timeout of {timeout_seconds}s")
+                        artifacts = []
 
                 # Move artifacts to build/<project>/<build_id>
                 out_base = Path.cwd() / "build" / project_name / build_id
@@ -30,6 +30,10 @@ def create_venv(workdir: Path) -> Tuple[Path, Path, Path]:
     if not venv_dir.exists():
         import venv
         venv.EnvBuilder(with_pip=True).create(str(venv_dir))
+    return _venv_bins(venv_dir)
+
+
+def _venv_bins(venv_dir: Path) -> Tuple[Path, Path, Path]:
     if os.name == 'nt':
         python = venv_dir / "Scripts" / "python.exe"
         pip = venv_dir / "Scripts" / "pip.exe"
@@ -39,6 +43,37 @@ def create_venv(workdir: Path) -> Tuple[Path, Path, Path]:
     return venv_dir, python, pip
 
 
+_SHARED_VENV_LOCK = asyncio.Lock()
+
+
+def _create_shared_venv(venv_dir: Path) -> None:
+    # venvs are not relocatable, so build in place under a lock file and mark completion
+    ready = venv_dir / ".forgex_ready"
+    venv_dir.parent.mkdir(parents=True, exist_ok=True)
+    with open(venv_dir.parent / f".{venv_dir.name}.lock", "w") as lock:
+        try:
+            import fcntl
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        except ImportError:
+            pass  # Windows: the in-process asyncio lock still serialises this server's builds
+        if ready.exists():
+            return
+        import venv
+        venv.EnvBuilder(with_pip=True, clear=venv_dir.exists()).create(str(venv_dir))
+        ready.touch()
+
+
+async def ensure_shared_venv_async(venv_dir: Path) -> Tuple[Path, Path, Path]:
+    """Create (once) a venv shared by all builds at venv_dir and return (venv_dir, python, pip).
+
+    Completion is recorded with a marker file, so a venv left half-created by a crash is rebuilt.
+    """
+    async with _SHARED_VENV_LOCK:
+        if not (venv_dir / ".forgex_ready").exists():
+            await asyncio.to_thread(_create_shared_venv, venv_dir)
+    return _venv_bins(venv_dir)
+
+
 async def ensure_venv_async(workdir: Path) -> Tuple[Path, Path, Path]:
     """Async variant that avoids blocking the event loop."""
     venv_dir = workdir / ".venv"
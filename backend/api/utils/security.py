@@ -21,7 +21,7 @@ def validate_command(cmd: List[str]) -> bool:
     base = base.lower().replace('.exe','')
     if base not in ALLOWED_TOOLS:
         return False
-    joined = ' '.join(shlex.quote(c) for c in cmd)
+    joined = shlex.join(cmd)
     for bad in BLACKLIST_TOKENS:
         if bad in joined:
             return False
@@ -86,6 +86,13 @@ class LogManager:
                 except Exception:
                     pass
 
+    def make_log_cb(self, build_id: str):
+        # Adapter log callback; .debug_enabled lets adapters skip formatting debug lines that emit_log would drop
+        async def _log_cb(level: str, message: str):
+            await self.emit_log(build_id, level, message)
+        _log_cb.debug_enabled = self.verbose.get(build_id, False)
+        return _log_cb
+
     def set_verbose(self, build_id: str, enable: bool) -> None:
         # Enable or disable verbose (debug) logs for a specific build
         if enable:
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+
+class FakeProc:
+    """Stand-in for asyncio.subprocess.Process: fixed output, then exit (or hang until signalled)."""
+
+    def __init__(self, stdout=b'', stderr=b'', returncode=0, hang=False):
+        self.stdout = asyncio.StreamReader()
+        self.stderr = asyncio.StreamReader()
+        self.stdout.feed_data(stdout)
+        self.stderr.feed_data(stderr)
+        self.returncode = None
+        self.signals = []
+        self._code = returncode
+        self._exited = asyncio.Event()
+        if not hang:
+            self._finish(returncode)
+
+    def _finish(self, code):
+        self._code = code
+        for s in (self.stdout, self.stderr):
+            if not s.at_eof():
+                s.feed_eof()
+        self._exited.set()
+
+    async def wait(self):
+        await self._exited.wait()
+        self.returncode = self._code
+        return self.returncode
+
+    def terminate(self):
+        self.signals.append('terminate')
+        self._finish(-15)
+
+    def kill(self):
+        self.signals.append('kill')
+        self._finish(-9)
+
+
+@pytest.fixture
+def fake_exec(monkeypatch):
+    """Patch asyncio.create_subprocess_exec; call with FakeProc kwargs, returns the list of spawned fakes."""
+    def install(**kw):
+        procs = []
+
+        async def create(*cmd, **_):
+            procs.append(FakeProc(**kw))
+            return procs[-1]
+        monkeypatch.setattr(asyncio, 'create_subprocess_exec', create)
+        return procs
+    return install
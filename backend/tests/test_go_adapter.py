@@ -0,0 +1,59 @@
+import asyncio
+
+from backend.api.adapters.go_adapter import _line_level, _mod_marker, _run_and_stream, _touch_marker
+
+
+def test_line_level_flags_go_failures_only():
+    assert _line_level('./main.go:12:5: undefined: foo') == 'error'
+    assert _line_level('# example.com/app') == 'error'
+    assert _line_level('panic: boom') == 'error'
+    assert _line_level('go: errors parsing go.mod:') == 'error'
+    assert _line_level('go: cannot find main module, but found .git/config') == 'error'
+    assert _line_level("can't load package: package x: no Go files") == 'error'
+    assert _line_level('vet: main.go: cannot import "C"') == 'error'
+    assert _line_level('go: downloading github.com/pkg/errors v0.9.1') == 'info'
+    assert _line_level('golang.org/x/xerrors v0.0.0-2020') == 'info'
+
+
+def test_mod_marker_follows_go_sum(tmp_path):
+    (tmp_path / 'go.mod').write_text('module x\n')
+    (tmp_path / 'go.sum').write_text('a v1 h1:x\n')
+    names = {'go.mod', 'go.sum'}
+    marker = _mod_marker(tmp_path, names, tmp_path / 'modcache')
+    assert marker.parent == tmp_path / 'modcache' / '.forgex'
+    _touch_marker(marker)
+    assert marker.exists()
+    (tmp_path / 'go.sum').write_text('a v2 h1:y\n')
+    assert not _mod_marker(tmp_path, names, tmp_path / 'modcache').exists()
+    (tmp_path / 'go.sum').unlink()
+    assert _mod_marker(tmp_path, names, tmp_path / 'modcache') is None
+
+
+def test_run_and_stream_kills_and_reaps_when_the_build_task_is_cancelled(fake_exec):
+    procs = fake_exec(stdout=b'go: downloading x v1\n', hang=True)
+    seen = []
+
+    async def log_cb(level, message):
+        seen.append((level, message))
+
+    async def main():
+        task = asyncio.create_task(_run_and_stream(['go', 'build'], {}, '.', log_cb, 5, asyncio.Event()))
+        await asyncio.sleep(0.01)
+        task.cancel()  # what asyncio.wait_for does on the runner's build timeout
+        try:
+            await task
+        except asyncio.CancelledError:
+            return True
+    assert asyncio.run(main())
+    assert procs[0].signals == ['kill'] and procs[0].returncode is not None
+    assert seen == [('info', 'go: downloading x v1')]
+
+
+def test_run_and_stream_emits_unterminated_last_line(fake_exec):
+    fake_exec(stdout=b'./a.go:1:2: bad\n' + 'é'.encode() * 40000, returncode=2)
+    seen = []
+
+    async def log_cb(level, message):
+        seen.append((level, message))
+    assert asyncio.run(_run_and_stream(['go', 'build'], {}, '.', log_cb, 5, asyncio.Event())) == 2
+    assert seen == [('error', './a.go:1:2: bad'), ('info', 'é' * 40000)]
@@ -0,0 +1,91 @@
+import asyncio
+
+from backend.api.adapters.node_adapter import (
+    _base_env, _deps_hash, _detect_entry, _line_level, _restore_node_modules, _run_and_stream, _store_node_modules,
+)
+
+
+def test_detect_entry_from_start_command(tmp_path):
+    assert _detect_entry(tmp_path, 'node server.js') == 'server.js'
+
+
+def test_detect_entry_from_package_json(tmp_path):
+    (tmp_path / 'package.json').write_text('{"name": "x", "main": "lib/index.js"}')
+    assert _detect_entry(tmp_path, '') == 'lib/index.js'
+    (tmp_path / 'package.json').write_text('{"name": "x", "bin": "cli.js", "main": "lib/index.js"}')
+    assert _detect_entry(tmp_path, '') == 'cli.js'
+
+
+def test_detect_entry_fallback_names(tmp_path):
+    (tmp_path / 'package.json').write_text('not json')
+    (tmp_path / 'app.js').write_text('')
+    assert _detect_entry(tmp_path, 'npm run start') == 'app.js'
+
+
+def test_detect_entry_quoted_start_command(tmp_path):
+    assert _detect_entry(tmp_path, 'node "my server.js" --port 3000') == 'my server.js'
+
+
+def test_line_level_only_flags_anchored_errors():
+    assert _line_level('npm ERR! code ERESOLVE') == 'error'
+    assert _line_level('Error: Cannot find module x') == 'error'
+    assert _line_level('gyp ERR! find Python') == 'error'
+    assert _line_level('pkg/prelude: cannot resolve native addon') == 'error'
+    assert _line_level('added 3 packages: error-ex, is-arrayish') == 'info'
+    assert _line_level('> Warning Cannot include file %1 into executable (error-ex)') == 'warn'
+    assert _line_level('npm WARN deprecated inflight@1.0.6: not supported') == 'warn'
+
+
+def test_base_env_is_read_per_call_and_keeps_native_toolchain(monkeypatch):
+    monkeypatch.setenv('CC', 'clang')
+    monkeypatch.setenv('ProgramFiles(x86)', r'C:\Program Files (x86)')
+    monkeypatch.setenv('npm_config_cache', '/c')
+    monkeypatch.setenv('FORGEX_SECRET', 'x')
+    env = _base_env()
+    assert env['CC'] == 'clang' and 'npm_config_cache' in env and 'FORGEX_SECRET' not in env
+    assert any(k.upper() == 'PROGRAMFILES(X86)' for k in env)
+    monkeypatch.setenv('CXX', 'clang++')
+    assert _base_env()['CXX'] == 'clang++'
+
+
+def test_deps_hash_tracks_lockfile_and_toolchain(tmp_path):
+    (tmp_path / 'package.json').write_text('{"name": "x"}')
+    key = _deps_hash(tmp_path, 'v20.1.0 linux x64 115 npm10')
+    assert key == _deps_hash(tmp_path, 'v20.1.0 linux x64 115 npm10')
+    assert key != _deps_hash(tmp_path, 'v22.0.0 linux x64 127 npm10')
+    (tmp_path / 'package-lock.json').write_text('{}')
+    assert key != _deps_hash(tmp_path, 'v20.1.0 linux x64 115 npm10')
+
+
+def test_node_modules_cache_restores_a_private_copy(tmp_path):
+    src = tmp_path / 'proj' / 'node_modules' / 'dep'
+    src.mkdir(parents=True)
+    (src / 'index.js').write_text('v1')
+    entry = tmp_path / 'cache' / 'abc'
+    entry.parent.mkdir()
+    _store_node_modules(tmp_path / 'proj' / 'node_modules', entry)
+    other = tmp_path / 'other'
+    (other / 'node_modules').mkdir(parents=True)
+    _restore_node_modules(entry / 'node_modules', other)
+    restored = other / 'node_modules' / 'dep' / 'index.js'
+    assert not (other / 'node_modules').is_symlink() and restored.read_text() == 'v1'
+    restored.write_text('patched by postinstall')
+    assert (entry / 'node_modules' / 'dep' / 'index.js').read_text() == 'v1'
+
+
+def test_run_and_stream_cancel_drains_merged_output(fake_exec):
+    procs = fake_exec(stdout=b'npm WARN deprecated a@1: old\nnpm ERR! code E1\n', hang=True)
+    seen = []
+
+    async def log_cb(level, message):
+        seen.append((level, message))
+
+    async def main():
+        ev = asyncio.Event()
+        task = asyncio.create_task(_run_and_stream(['npm', 'ci'], {}, '.', log_cb, 5, ev))
+        await asyncio.sleep(0.01)
+        ev.set()
+        return await task
+    assert asyncio.run(main()) == -1
+    assert procs[0].signals == ['terminate'] and procs[0].returncode is not None
+    assert seen[:2] == [('warn', 'npm WARN deprecated a@1: old'), ('error', 'npm ERR! code E1')]
@@ -0,0 +1,212 @@
+import ast
+import asyncio
+import hashlib
+import os
+import re
+from types import SimpleNamespace
+
+from backend.api.adapters import python_adapter
+from backend.api.adapters.python_adapter import (
+    _EXCLUDED_DIRS, _STREAM_LIMIT, _add_data, _convert_icon, _detect_framework_pkgs, _encrypts_env, _hook_source, _init_chain, _install_build_pkgs, _needs_pillow,
+    _parse_entry_from_start, _render_hook, _render_helpers, _req_names, _run_and_stream, _runtime_hook, _scan_entries,
+    _scan_names, _split_start_cmd, _stderr_level,
+)
+
+
+def test_scan_entries_prunes_excluded_dirs(tmp_path):
+    (tmp_path / '.venv' / 'lib').mkdir(parents=True)
+    (tmp_path / '.venv' / 'lib' / 'main.py').write_text('')
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'main.py').write_text('')
+    found, py_files = _scan_entries(tmp_path, {'main.py', 'app.py'}, _EXCLUDED_DIRS)
+    assert found == {'main.py': os.path.join('src', 'main.py')}
+    assert py_files == [os.path.join('src', 'main.py')]
+
+
+def test_scan_entries_prefers_root_level_match(tmp_path):
+    (tmp_path / 'pkg').mkdir()
+    (tmp_path / 'pkg' / 'app.py').write_text('')
+    (tmp_path / 'app.py').write_text('')
+    found, py_files = _scan_entries(tmp_path, {'app.py'}, _EXCLUDED_DIRS)
+    assert found['app.py'] == 'app.py'
+    assert len(py_files) == 2
+
+
+def test_init_chain_and_scan_names(tmp_path):
+    (tmp_path / 'a' / 'b').mkdir(parents=True)
+    (tmp_path / 'a' / 'b' / '__init__.py').write_text('')
+    (tmp_path / 'a' / 'b' / 'mod.py').write_text('')
+    assert _init_chain(tmp_path, ['a', 'b']) == [False, True]
+    assert _scan_names(tmp_path / 'a' / 'b') == {'__init__.py', 'mod.py'}
+    assert _scan_names(tmp_path / 'missing') == set()
+
+
+def test_detect_framework_pkgs_ignores_comments(tmp_path):
+    ep = tmp_path / 'app.py'
+    ep.write_text('# from django import x\nimport os\nfrom flask import Flask\nimport fastapi.routing\n')
+    assert _detect_framework_pkgs(ep) == {'flask', 'fastapi'}
+
+
+def test_detect_framework_pkgs_falls_back_on_syntax_error(tmp_path):
+    ep = tmp_path / 'app.py'
+    ep.write_text('from flask import Flask\ndef broken(:\n')
+    assert _detect_framework_pkgs(ep) == {'flask'}
+
+
+def test_render_hook_substitutes_params():
+    src = _render_hook('autostart_windows', _METHOD='startup', _NAME="My 'App'").decode('utf-8')
+    ns = {}
+    exec(compile(src, 'hook.py', 'exec'), ns)
+    assert ns['_METHOD'] == 'startup' and ns['_NAME'] == "My 'App'"
+    assert 'forgex params' not in src
+
+
+def test_parse_entry_from_start_forms():
+    def parse(cmd):
+        return _parse_entry_from_start(_split_start_cmd(cmd))
+    assert parse('python app.py') == 'app.py'
+    assert parse('python -m pkg.main') == 'pkg/main.py'
+    assert parse('uvicorn api.main:app --port 8000') == 'api/main.py'
+    assert parse('python "my app.py"') == 'my app.py'
+    assert parse('app.py') is None
+    assert parse('') is None and parse(None) is None
+
+
+def test_scan_entries_finds_nested_env_without_py_limit(tmp_path):
+    (tmp_path / 'venv').mkdir()
+    (tmp_path / 'venv' / '.env').write_text('')
+    (tmp_path / 'cfg').mkdir()
+    (tmp_path / 'cfg' / '.env').write_text('')
+    (tmp_path / 'app.py').write_text('')
+    found, py_files = _scan_entries(tmp_path, {'.env'}, _EXCLUDED_DIRS, 0)
+    assert found == {'.env': os.path.join('cfg', '.env')}
+    assert py_files == []
+
+
+def test_needs_pillow_only_for_windows_non_ico(tmp_path):
+    png = tmp_path / 'icon.png'; png.write_bytes(b'')
+    ico = tmp_path / 'icon.ico'; ico.write_bytes(b'')
+    assert _needs_pillow(SimpleNamespace(target_os='windows', icon_path=str(png), process_icon_path=None))
+    assert not _needs_pillow(SimpleNamespace(target_os='windows', icon_path=str(ico), process_icon_path=None))
+    assert not _needs_pillow(SimpleNamespace(target_os='linux', icon_path=str(png), process_icon_path=None))
+    assert _needs_pillow(SimpleNamespace(target_os='windows', icon_path=str(ico), process_icon_path=str(ico)))
+
+
+def test_encrypts_env_requires_include_env_and_enable():
+    enc = {'protect': {'encrypt_env': {'enable': True}}}
+    assert _encrypts_env(SimpleNamespace(include_env=True, pyinstaller=enc))
+    assert not _encrypts_env(SimpleNamespace(include_env=False, pyinstaller=enc))
+    assert not _encrypts_env(SimpleNamespace(include_env=True, pyinstaller=None))
+
+
+def test_add_data_uses_host_separator():
+    assert _add_data('a.txt') == ('--add-data', f'a.txt{os.pathsep}.')
+    assert _add_data('cfg', 'conf') == ('--add-data', f'cfg{os.pathsep}conf')
+
+
+def test_render_helpers_fills_log_and_pause():
+    ps, cmd = _render_helpers('app.exe', True, 'run.log', 7)
+    assert b"'app.exe'" in ps
+    assert b'set LOG=%~dp0run.log\r\n' in cmd and cmd.endswith(b'timeout /t 7 /nobreak >nul\r\n')
+    _, plain = _render_helpers('app.exe', False, None, None)
+    assert b'LOG' not in plain
+
+
+def test_req_names_skips_options_urls_and_markers(tmp_path):
+    req = tmp_path / 'requirements.txt'
+    req.write_text('-r base.txt\nflask>=2.0  # web\n\ngit+https://x/y.git\nuvicorn[standard]==0.30; python_version>"3.8"\n')
+    assert _req_names(req) == ['flask', 'uvicorn']
+
+
+def test_stderr_level_precedence():
+    assert _stderr_level(b'1234 INFO: Building EXE\n') == 'info'
+    assert _stderr_level(b'WARNING: lib not found; info: retry\n') == 'info'
+    assert _stderr_level(b'SyntaxWarning: invalid escape\n') == 'warn'
+    assert _stderr_level(b'[notice] A new release of pip is available: 23.0 -> 24.0\n') == 'info'
+    assert _stderr_level(b'Traceback (most recent call last):\n') == 'error'
+
+
+def test_runtime_hook_uses_shipped_file_for_defaults(tmp_path):
+    files = {}
+    assert _runtime_hook('pause_on_exit', tmp_path / 'p.py', files, _SECS=5).parent.name == '_pyi_hooks'
+    assert files == {}
+    assert _runtime_hook('pause_on_exit', tmp_path / 'p.py', files, _SECS=9) == tmp_path / 'p.py'
+    assert b'_SECS = 9' in files[tmp_path / 'p.py']
+
+
+def test_convert_icon_reuses_cached_conversion(tmp_path, monkeypatch):
+    monkeypatch.setenv('FORGEX_ICON_CACHE', str(tmp_path / 'cache'))
+    src = tmp_path / 'icon.png'; src.write_bytes(b'png')
+    seen = []
+
+    async def log_cb(level, message):
+        seen.append(message)
+
+    def convert(out):
+        return asyncio.run(_convert_icon(tmp_path / 'no-python', src, out, {}, tmp_path, log_cb, 5, asyncio.Event()))
+    assert not convert(tmp_path / 'a.ico')
+    (tmp_path / 'cache').mkdir()
+    (tmp_path / 'cache' / f"{hashlib.sha256(b'png').hexdigest()}.ico").write_bytes(b'ico')
+    assert convert(tmp_path / 'b.ico') and (tmp_path / 'b.ico').read_bytes() == b'ico'
+    assert any('Icon cache hit' in m for m in seen)
+
+
+def test_install_build_pkgs_keeps_pyinstaller_when_optional_spec_fails(tmp_path, monkeypatch):
+    installed = set()
+    mods = {'pyinstaller': 'PyInstaller', 'pillow': 'PIL', 'flask': 'flask'}
+
+    async def fake_missing(py_bin, modules, env, cwd):
+        return {m for m in modules if m not in installed}
+
+    async def fake_run(cmd, env, cwd, log_cb, timeout, cancel_event):
+        specs = [a for a in cmd[cmd.index('install') + 1:] if not a.startswith('-')]
+        if 'pillow' in specs:
+            return 1  # one bad spec fails the whole resolve
+        installed.update(mods[s] for s in specs)
+        return 0
+
+    async def log_cb(level, message):
+        pass
+    monkeypatch.setattr(python_adapter, '_missing_modules', fake_missing)
+    monkeypatch.setattr(python_adapter, '_run_and_stream', fake_run)
+    pkgs = [('PyInstaller', 'pyinstaller'), ('PIL', 'pillow'), ('flask', 'flask')]
+    assert asyncio.run(_install_build_pkgs(tmp_path / 'python', pkgs, {}, tmp_path, log_cb, 5, asyncio.Event()))
+    assert installed == {'PyInstaller', 'flask'}
+
+
+def test_run_and_stream_splits_overlong_unterminated_line(fake_exec):
+    data = b'x' * (_STREAM_LIMIT + 10)
+    fake_exec(stdout=data, stderr=b'1 INFO: done\n')
+    seen = []
+
+    async def log_cb(level, message):
+        seen.append((level, message))
+    assert asyncio.run(_run_and_stream(['python', '-V'], {}, '.', log_cb, 5, asyncio.Event())) == 0
+    out = [m for lvl, m in seen if lvl == 'info' and m.startswith('x')]
+    assert len(out) == 2 and ''.join(out) == data.decode()
+    assert ('info', '1 INFO: done') in seen
+
+
+def test_run_and_stream_cancel_terminates_and_reaps(fake_exec):
+    procs = fake_exec(stdout=b'working\n', hang=True)
+
+    async def log_cb(level, message):
+        pass
+
+    async def main():
+        ev = asyncio.Event()
+        task = asyncio.create_task(_run_and_stream(['python', 'x.py'], {}, '.', log_cb, 5, ev))
+        await asyncio.sleep(0.01)
+        ev.set()
+        return await task
+    assert asyncio.run(main()) == -1
+    assert procs[0].signals == ['terminate'] and procs[0].returncode is not None
+
+
+def test_env_decrypt_line_regex():
+    tree = ast.parse(_hook_source('env_decrypt'))
+    node = next(n for n in tree.body if isinstance(n, ast.Assign) and getattr(n.targets[0], 'id', '') == '_ENV_LINE_RE')
+    line_re = eval(compile(ast.Expression(node.value), 'env_decrypt', 'eval'), {'re': re})
+    raw = b'# comment\nA=1\r\nEMPTY=\n  C = x y \nnoeq\n=bad\nURL=a=b\n'
+    pairs = [(k.strip(), v.strip()) for k, v in line_re.findall(raw)]
+    assert pairs == [(b'A', b'1'), (b'EMPTY', b''), (b'C', b'x y'), (b'URL', b'a=b')]